@@ -1,15 +1,27 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from langchain.agents import AgentExecutor
-from langchain_cohere.react_multi_hop.agent import create_cohere_react_agent
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_cohere import ChatCohere
-from langchain_community.tools.tavily_search import TavilySearchResults
 from pydantic import BaseModel, Field
 import os
 import logging
 import json
-from typing import List, Optional, Dict
+import time
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed, wait
+from typing import TYPE_CHECKING, Any, List, Optional, Dict
+from services.clients import registry, get_llm, get_search_tool, warm_up
+from services.cache import create_cache, cache_key
+from services.claims import extract_claims
+from services import metrics
+from services.compression import enable_compression
+from services.sources import normalize_sources, expand_source
+
+# langchain's agent machinery is imported by create_search_agent, on a
+# warm-up thread at startup or on the first request
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+    from langchain_cohere import ChatCohere
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +30,44 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+enable_compression(app)
+
+# Stance pipelines run concurrently; each one gets its own deadline so a slow
+# search or LLM round trip only degrades its own half of the response.
+STANCES = ("supporting", "opposing")
+STANCE_TIMEOUT = float(os.environ.get("STANCE_TIMEOUT", "45"))
+# Print each ReAct step; per-stage timings are on /metrics regardless
+AGENT_VERBOSE = os.environ.get("AGENT_VERBOSE", "0") == "1"
+stance_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("STANCE_WORKERS", "8")),
+    thread_name_prefix="stance"
+)
+
+# Claim-level cache of complete /invoke responses
+CLAIM_CACHE_FINGERPRINT = os.environ.get("CLAIM_CACHE_FINGERPRINT", "0") == "1"
+claim_cache = create_cache(
+    os.environ.get("CLAIM_CACHE", "memory"),
+    path=os.environ.get("CLAIM_CACHE_PATH", "claim_cache.sqlite3"),
+    max_size=int(os.environ.get("CLAIM_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("CLAIM_CACHE_TTL", "3600"))
+)
+
+# /invoke/batch: agent runs of all batch requests share BATCH_WORKERS threads,
+# and one request keeps at most BATCH_CONCURRENCY runs in flight, so a large
+# batch can't starve concurrent ones (e.g. liveAudio's dispatcher).
+# BATCH_ANALYSIS_SIZE agent outputs share one fallback factuality prompt.
+#
+# A batch of n claims takes about 2n / BATCH_CONCURRENCY rounds of agent runs,
+# which must fit in BATCH_TIMEOUT: at the defaults a 50-claim batch needs 13
+# rounds in 180s, i.e. agent runs of up to ~14s. Runs still going at the
+# deadline are reported as timed out but keep their thread until they return.
+BATCH_MAX_CLAIMS = int(os.environ.get("BATCH_MAX_CLAIMS", "50"))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "8"))
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "32"))
+BATCH_ANALYSIS_SIZE = int(os.environ.get("BATCH_ANALYSIS_SIZE", "6"))
+BATCH_TIMEOUT = float(os.environ.get("BATCH_TIMEOUT", "180"))
+CLAIM_THRESHOLD = float(os.environ.get("CLAIM_THRESHOLD", "0.5"))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
 
 class TavilySearchInput(BaseModel):
     query: str = Field(description="Query to search the internet with")
@@ -26,26 +76,10 @@ class FactCheckResult(BaseModel):
     is_factual: bool
     confidence: float
     reasoning: str
-    sources: Optional[List[Dict[str, str]]] = Field(default_factory=list)
-
-def extract_tavily_sources(agent_result: dict) -> List[str]:
-    """
-    Extracts source URLs from Tavily search results in the agent's intermediate steps
-    """
-    sources = set()  # Use a set to avoid duplicates
-    print("RESULT", agent_result)
-    # Look through intermediate steps for Tavily search results
-    for source in agent_result:
-        source.append(source)
-    
-    return list(sources)
+    sources: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
 
-def analyze_factuality(text: str, llm: ChatCohere) -> FactCheckResult:
-    """
-    Analyzes if a given text is saying that a certain statement is false or true.
-    Returns a structured response indicating whether the text claims something is true or false.
-    """
-    prompt = f"""
+def factuality_prompt(text: str) -> str:
+    return f"""
     You are an expert at analyzing statements. Your task is to determine if the following text is stating that something is true or false.
     DO NOT try to verify if the information itself is true - only analyze if the text is SAYING it's true or false.
 
@@ -60,33 +94,101 @@ def analyze_factuality(text: str, llm: ChatCohere) -> FactCheckResult:
 
     JSON Response:"""
 
-    response = llm.invoke(prompt)
-    
-    try:
-        analysis = json.loads(response.content)
-        if 'sources' not in analysis:
-            analysis['sources'] = []
+def factuality_batch_prompt(texts: List[str]) -> str:
+    numbered = "\n\n".join(f"[{index}]\n{text}" for index, text in enumerate(texts))
+    return f"""
+    You are an expert at analyzing statements. For each numbered text below, determine if it is stating that something is true or false.
+    DO NOT try to verify if the information itself is true - only analyze if the text is SAYING it's true or false.
+
+    Respond with a valid JSON array of exactly {len(texts)} objects, one per text and in the same order, each with these fields:
+    - index: integer (the number of the text being analyzed)
+    - is_factual: boolean (true if the text is saying something is true/correct, false if the text is saying something is false/incorrect)
+    - confidence: float between 0 and 1 (how clear is the text in making this true/false statement)
+    - reasoning: brief explanation of what words/phrases in the text indicate it's saying true or false
+    - sources: array of dictionaries (list of sources mentioned in the text, or empty array if none, each with 'url' and 'content' keys)
+
+    Texts to analyze:
+    {numbered}
+
+    JSON Response:"""
+
+def factuality_from_dict(analysis: dict) -> FactCheckResult:
+    """
+    Builds a FactCheckResult from one decoded analysis object, normalizing its sources
+    """
+    analysis = dict(analysis)
+    analysis.pop('index', None)
+    if 'sources' not in analysis:
+        analysis['sources'] = []
+    else:
+        # Ensure sources are in the correct format
+        if isinstance(analysis['sources'], list):
+            analysis['sources'] = [
+                {"url": source.get("url", "No URL"), "content": source.get("content", "No content")}
+                if isinstance(source, dict) else {"url": source, "content": "No content"}
+                for source in analysis['sources']
+            ]
         else:
-            # Ensure sources are in the correct format
-            if isinstance(analysis['sources'], list):
-                analysis['sources'] = [
-                    {"url": source.get("url", "No URL"), "content": source.get("content", "No content")}
-                    if isinstance(source, dict) else {"url": source, "content": "No content"}
-                    for source in analysis['sources']
-                ]
-            else:
-                # If sources is not a list, initialize it as empty
-                analysis['sources'] = []
-
-        return FactCheckResult(**analysis)
+            # If sources is not a list, initialize it as empty
+            analysis['sources'] = []
+
+    return FactCheckResult(**analysis)
+
+def parse_factuality(content: str) -> FactCheckResult:
+    """
+    Parses the factuality analyzer's JSON reply into a FactCheckResult.
+    Raises ValueError when the reply isn't a valid analysis, so the stance is
+    reported as failed instead of as a zero-confidence verdict that would be cached.
+    """
+    try:
+        return factuality_from_dict(json.loads(content))
     except Exception as e:
-        logger.error(f"Error parsing Cohere response: {e}")
-        return FactCheckResult(
-            is_factual=False,
-            confidence=0.0,
-            reasoning=f"Error analyzing response: {str(e)}",
-            sources=[]
-        )
+        raise ValueError(f"Error analyzing response: {e}") from e
+
+def analyze_factuality(text: str, llm: "ChatCohere") -> FactCheckResult:
+    """
+    Analyzes if a given text is saying that a certain statement is false or true.
+    Returns a structured response indicating whether the text claims something is true or false.
+    """
+    response = llm.invoke(factuality_prompt(text))
+    return parse_factuality(response.content)
+
+def analyze_factuality_individually(texts: List[str], llm: "ChatCohere") -> List[Optional[FactCheckResult]]:
+    analyses = []
+    for text in texts:
+        try:
+            analyses.append(analyze_factuality(text, llm))
+        except Exception as e:
+            logger.error(f"Factuality analysis failed: {e}")
+            analyses.append(None)
+    return analyses
+
+def analyze_factuality_batch(texts: List[str], llm: "ChatCohere") -> List[Optional[FactCheckResult]]:
+    """
+    Analyzes several texts with a single LLM call.
+    Falls back to one analyze_factuality call per text if the batched reply
+    can't be parsed; texts whose analysis still fails get None.
+    """
+    if len(texts) <= 1:
+        return analyze_factuality_individually(texts, llm)
+
+    response = llm.invoke(factuality_batch_prompt(texts))
+    try:
+        analyses = json.loads(response.content)
+        if not isinstance(analyses, list) or len(analyses) != len(texts):
+            raise ValueError(f"expected {len(texts)} analyses, got {len(analyses) if isinstance(analyses, list) else 'non-list'}")
+        by_index = {analysis.get("index", position): analysis for position, analysis in enumerate(analyses)}
+        return [factuality_from_dict(by_index[index]) for index in range(len(texts))]
+    except Exception as e:
+        logger.warning(f"Batched factuality analysis failed, analyzing individually: {e}")
+        return analyze_factuality_individually(texts, llm)
+
+async def analyze_factuality_async(text: str, llm: "ChatCohere") -> FactCheckResult:
+    """
+    Async variant of analyze_factuality
+    """
+    response = await llm.ainvoke(factuality_prompt(text))
+    return parse_factuality(response.content)
 
 def create_search_agent(stance: str):
     """
@@ -95,18 +197,17 @@ def create_search_agent(stance: str):
     Args:
         stance: Either "supporting" or "opposing" to determine the agent's perspective
     """
-    # Initialize the internet search tool
-    internet_search = TavilySearchResults(include_answer=True)
-    internet_search.name = "internet_search"
-    internet_search.description = "Returns relevant document snippets from the internet"
-    internet_search.args_schema = TavilySearchInput
-
-    # Initialize Cohere LLM
-    llm = ChatCohere(
-        cohere_api_key=os.environ['COHERE_API_KEY'],
-        model="command-r-plus-08-2024",
-        temperature=0
+    from langchain.agents import AgentExecutor
+    from langchain_cohere.react_multi_hop.agent import create_cohere_react_agent
+    from langchain_core.prompts import ChatPromptTemplate
+
+    # Shared internet search tool and Cohere LLM from the client registry
+    internet_search = get_search_tool(
+        name="internet_search",
+        description="Returns relevant document snippets from the internet",
+        args_schema=TavilySearchInput
     )
+    llm = get_llm()
 
     # Create stance-specific prompt
     if stance == "supporting":
@@ -117,10 +218,10 @@ def create_search_agent(stance: str):
         
         User query: {input}
         
-        Respond with:
-        1. Your conclusion about whether the claim is supported
-        2. Confidence level (0-1)
-        3. Reasoning based on the sources
+        Respond with a single JSON object and nothing else, with these fields:
+        - is_factual: boolean (your conclusion: true if the evidence shows the claim is true, false otherwise)
+        - confidence: float between 0 and 1 (how strongly the sources you found support the claim)
+        - reasoning: brief explanation based on the sources
         """
     else:
         prompt_text = """
@@ -130,57 +231,268 @@ def create_search_agent(stance: str):
         
         User query: {input}
         
-        Respond with:
-        1. Your conclusion about whether the claim is contradicted
-        2. Confidence level (0-1)
-        3. Reasoning based on the sources
+        Respond with a single JSON object and nothing else, with these fields:
+        - is_factual: boolean (your conclusion: true if the evidence shows the claim is true, false otherwise)
+        - confidence: float between 0 and 1 (how strongly the sources you found contradict the claim)
+        - reasoning: brief explanation based on the sources
         """
 
     prompt = ChatPromptTemplate.from_template(prompt_text)
     
     # Create the agent
     agent = create_cohere_react_agent(llm=llm, tools=[internet_search], prompt=prompt)
-    return AgentExecutor(agent=agent, tools=[internet_search], verbose=True)
+    return AgentExecutor(agent=agent, tools=[internet_search], verbose=AGENT_VERBOSE)
+
+def get_search_agent(stance: str) -> "AgentExecutor":
+    """
+    Returns the long-lived search agent for a stance, building it on first use
+    """
+    def build():
+        with metrics.span("create_search_agent", stance=stance):
+            return create_search_agent(stance)
+
+    return registry.get(("search_agent", stance), build)
+
+def extract_sources(citations) -> List[Dict[str, Any]]:
+    """
+    Flattens the documents attached to the agent's citations into url/content
+    pairs. Citations often share documents, so duplicates are collapsed and
+    long snippets capped (see services.sources).
+    """
+    sources = []
+    for citation in citations:
+        for document in citation.documents:
+            sources.append({
+                "url": document.get("url", "No URL"),
+                "content": document.get("content", "No content")
+            })
+    return normalize_sources(sources)
+
+def parse_structured_output(output: str) -> Optional[FactCheckResult]:
+    """
+    Reads the JSON verdict the search agent was asked to answer with.
+    Tolerates code fences and text around the object; returns None if no valid verdict is found.
+    """
+    start = output.find("{")
+    end = output.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        analysis = json.loads(output[start:end + 1])
+        if not isinstance(analysis, dict) or not {"is_factual", "confidence", "reasoning"} <= analysis.keys():
+            return None
+        result = factuality_from_dict(analysis)
+        result.confidence = min(1.0, max(0.0, float(result.confidence)))
+        return result
+    except Exception:
+        return None
 
 def parse_agent_response(response: dict) -> FactCheckResult:
     """
-    Parses the agent's response into a structured format
+    Parses the agent's response into a structured format.
+    Errors propagate so the caller reports the stance as failed and never caches it.
+    """
+    # Extract the output and citations from the response
+    output = response.get("output", "")
+    citations = response.get("citations", [])
+
+    # The agent answers with a JSON verdict; only fall back to the
+    # separate factuality analyzer when that can't be parsed
+    with metrics.span("parse_verdict"):
+        factuality = parse_structured_output(output)
+    if factuality is None:
+        logger.warning("Agent output was not a valid verdict, falling back to factuality analysis")
+        metrics.count("verdict_fallbacks_total")
+        with metrics.span("analyze_factuality"):
+            factuality = analyze_factuality(output, get_llm())
+
+    return FactCheckResult(
+        is_factual=factuality.is_factual,
+        confidence=factuality.confidence,
+        reasoning=factuality.reasoning,
+        sources=extract_sources(citations)
+    )
+
+async def parse_agent_response_async(response: dict) -> FactCheckResult:
+    """
+    Async variant of parse_agent_response
     """
+    output = response.get("output", "")
+    with metrics.span("parse_verdict"):
+        factuality = parse_structured_output(output)
+    if factuality is None:
+        logger.warning("Agent output was not a valid verdict, falling back to factuality analysis")
+        metrics.count("verdict_fallbacks_total")
+        with metrics.span("analyze_factuality"):
+            factuality = await analyze_factuality_async(output, get_llm())
+    return FactCheckResult(
+        is_factual=factuality.is_factual,
+        confidence=factuality.confidence,
+        reasoning=factuality.reasoning,
+        sources=extract_sources(response.get("citations", []))
+    )
+
+def run_stance(stance: str, query: str) -> FactCheckResult:
+    """
+    Runs the full pipeline for one stance: search agent, whose JSON verdict is
+    parsed directly, with factuality analysis only as a fallback
+    """
+    agent = get_search_agent(stance)
+    with metrics.span("search_agent", stance=stance):
+        result = agent.invoke({"input": query})
+    return parse_agent_response(result)
+
+def stance_failure(stance: str, reason: str) -> FactCheckResult:
+    """
+    Placeholder result for a stance that timed out or raised
+    """
+    return FactCheckResult(
+        is_factual=False,
+        confidence=0.0,
+        reasoning=f"No {stance} analysis available: {reason}",
+        sources=[]
+    )
+
+def iter_stances(query: str, timeout: float = STANCE_TIMEOUT):
+    """
+    Runs the supporting and opposing pipelines concurrently and yields each
+    stance as soon as it finishes.
+
+    Stances that miss the shared deadline or raise are yielded as a
+    zero-confidence placeholder so callers always receive every stance.
+
+    Yields:
+        (stance, result, ok) in completion order
+    """
+    # Each stance runs in a copy of the caller's context so its spans join the request trace
+    futures = {
+        stance_executor.submit(contextvars.copy_context().run, run_stance, stance, query): stance
+        for stance in STANCES
+    }
     try:
-        # Extract the output and citations from the response
-        output = response.get("output", "")
-        citations = response.get("citations", [])
-
-        # Use the existing factuality analyzer to process the output
-        llm = ChatCohere(cohere_api_key=os.environ['COHERE_API_KEY'], model="command-r-plus-08-2024", temperature=0)
-        factuality = analyze_factuality(output, llm)
-
-        # Extract sources from citations
-        sources = []
-        print("SOURCES\n\n")
-        for citation in citations:
-            print(citation)
-            for document in citation.documents:
-                print(document)
-                sources.append({
-                    "url": document.get("url", "No URL"),
-                    "content": document.get("content", "No content")
-                })
-
-        return FactCheckResult(
-            is_factual=factuality.is_factual,
-            confidence=factuality.confidence,
-            reasoning=factuality.reasoning,
-            sources=sources
-        )
-    except Exception as e:
-        logger.error(f"Error parsing agent response: {e}")
-        return FactCheckResult(
-            is_factual=False,
-            confidence=0.0,
-            reasoning=f"Error parsing response: {str(e)}",
-            sources=[]
+        for future in as_completed(futures, timeout=timeout):
+            stance = futures.pop(future)
+            try:
+                yield stance, future.result(), True
+            except Exception as e:
+                logger.error(f"Error in {stance} stance: {e}")
+                yield stance, stance_failure(stance, str(e)), False
+    except FutureTimeoutError:
+        for future, stance in futures.items():
+            future.cancel()
+            logger.warning(f"{stance} stance timed out after {timeout}s")
+            yield stance, stance_failure(stance, f"timed out after {timeout:g}s"), False
+
+def run_stances(query: str, timeout: float = STANCE_TIMEOUT):
+    """
+    Runs the supporting and opposing pipelines concurrently.
+
+    Each stance is awaited against a shared deadline; stances that miss it or
+    raise are replaced with a zero-confidence placeholder so the other half of
+    the response is still returned.
+
+    Returns:
+        (results, failed): results keyed by stance, and the list of stances that failed
+    """
+    results = {}
+    failed = []
+    for stance, result, ok in iter_stances(query, timeout):
+        results[stance] = result
+        if not ok:
+            failed.append(stance)
+    return results, failed
+
+async def run_stance_async(stance: str, query: str, executor: Optional[ThreadPoolExecutor] = None) -> FactCheckResult:
+    """
+    Async variant of run_stance, for the ASGI server.
+
+    The Cohere ReAct agent needs raw prompting, which ChatCohere only supports
+    on its synchronous client, so the agent runs on `executor` (the loop's
+    default executor if None) and only the factuality analysis is async.
+    """
+    agent = get_search_agent(stance)
+    loop = asyncio.get_running_loop()
+    with metrics.span("search_agent", stance=stance):
+        result = await loop.run_in_executor(
+            executor, contextvars.copy_context().run, agent.invoke, {"input": query}
         )
+    return await parse_agent_response_async(result)
+
+async def iter_stances_async(query: str, timeout: float = STANCE_TIMEOUT,
+                             executor: Optional[ThreadPoolExecutor] = None):
+    """
+    Async variant of iter_stances. A stance that times out stops being
+    awaited, but its agent keeps its executor thread until it returns.
+    """
+    async def run(stance):
+        try:
+            return stance, await asyncio.wait_for(run_stance_async(stance, query, executor), timeout), True
+        except asyncio.TimeoutError:
+            logger.warning(f"{stance} stance timed out after {timeout}s")
+            return stance, stance_failure(stance, f"timed out after {timeout:g}s"), False
+        except Exception as e:
+            logger.error(f"Error in {stance} stance: {e}")
+            return stance, stance_failure(stance, str(e)), False
+
+    for next_done in asyncio.as_completed([run(stance) for stance in STANCES]):
+        yield await next_done
+
+async def run_stances_async(query: str, timeout: float = STANCE_TIMEOUT,
+                            executor: Optional[ThreadPoolExecutor] = None):
+    """
+    Async variant of run_stances with the same timeout and partial-result semantics
+    """
+    results = {}
+    failed = []
+    async for stance, result, ok in iter_stances_async(query, timeout, executor):
+        results[stance] = result
+        if not ok:
+            failed.append(stance)
+    return results, failed
+
+def evidence_dict(analysis: FactCheckResult) -> dict:
+    return {
+        "is_factual": analysis.is_factual,
+        "confidence": analysis.confidence,
+        "reasoning": analysis.reasoning,
+        "sources": analysis.sources
+    }
+
+def build_response(query: str, supporting_analysis: FactCheckResult, opposing_analysis: FactCheckResult,
+                   failed: List[str] = ()) -> dict:
+    """
+    Combines both stance results into the /invoke response payload.
+
+    A stance in `failed` only has a placeholder result, so no verdict is
+    derived from comparing the two: the response is marked partial, lists
+    the missing stances (as JudgeAgent.merge does for /query) and
+    recommends "insufficient_evidence".
+    """
+    response_data = {
+        "query": query,
+        "supporting_evidence": evidence_dict(supporting_analysis),
+        "opposing_evidence": evidence_dict(opposing_analysis),
+    }
+    if failed:
+        response_data["overall_assessment"] = {
+            "conflicting_evidence": False,
+            "confidence_differential": None,
+            "recommendation": "insufficient_evidence"
+        }
+        response_data["partial"] = True
+        response_data["missing"] = [stance for stance in STANCES if stance in failed]
+        return response_data
+
+    conflicting = supporting_analysis.confidence > 0.5 and opposing_analysis.confidence > 0.5
+    response_data["overall_assessment"] = {
+        "conflicting_evidence": conflicting,
+        "confidence_differential": abs(supporting_analysis.confidence - opposing_analysis.confidence),
+        "recommendation": "needs_further_investigation" if conflicting else "supported" if supporting_analysis.confidence > opposing_analysis.confidence else "contradicted"
+    }
+    return response_data
+
+def claim_key(query: str) -> str:
+    return cache_key(query, fingerprint=CLAIM_CACHE_FINGERPRINT, namespace="claim")
 
 @app.route('/invoke', methods=['POST'])
 def invoke_dual_agents():
@@ -188,46 +500,314 @@ def invoke_dual_agents():
         # Get the JSON data from the request
         data = request.json
         input_data = TavilySearchInput(**data)
-        
-        # Create agents for both perspectives
-        supporting_agent = create_search_agent("supporting")
-        opposing_agent = create_search_agent("opposing")
-        
-        # Run both agents in parallel (in a production environment, you might want to use async)
-        supporting_result = supporting_agent.invoke({"input": input_data.query})
-        opposing_result = opposing_agent.invoke({"input": input_data.query})
-        
-        # Parse results
-        supporting_analysis = parse_agent_response(supporting_result)
-        opposing_analysis = parse_agent_response(opposing_result)
-        
-        # Combine results
-        response_data = {
-            "query": input_data.query,
-            "supporting_evidence": {
-                "is_factual": supporting_analysis.is_factual,
-                "confidence": supporting_analysis.confidence,
-                "reasoning": supporting_analysis.reasoning,
-                "sources": supporting_analysis.sources
-            },
-            "opposing_evidence": {
-                "is_factual": opposing_analysis.is_factual,
-                "confidence": opposing_analysis.confidence,
-                "reasoning": opposing_analysis.reasoning,
-                "sources": opposing_analysis.sources
-            },
-            "overall_assessment": {
-                "conflicting_evidence": supporting_analysis.confidence > 0.5 and opposing_analysis.confidence > 0.5,
-                "confidence_differential": abs(supporting_analysis.confidence - opposing_analysis.confidence),
-                "recommendation": "needs_further_investigation" if (supporting_analysis.confidence > 0.5 and opposing_analysis.confidence > 0.5) else "supported" if supporting_analysis.confidence > opposing_analysis.confidence else "contradicted"
-            }
-        }
-        
-        return jsonify(response_data), 200
+
+        with metrics.trace("invoke") as trace:
+            key = claim_key(input_data.query)
+            if claim_cache is not None:
+                cached = claim_cache.get(key)
+                if cached is not None:
+                    metrics.count("claim_cache_total", result="hit")
+                    return jsonify(cached), 200, {"X-Cache": "HIT"}
+                metrics.count("claim_cache_total", result="miss")
+
+            # Run both stance pipelines concurrently, each bounded by STANCE_TIMEOUT
+            results, failed = run_stances(input_data.query)
+
+            response_data = build_response(input_data.query, results["supporting"], results["opposing"], failed)
+            # Partial results are returned but never cached
+            if claim_cache is not None and not failed:
+                claim_cache.set(key, response_data)
+        headers = {"X-Cache": "MISS"}
+        if trace is not None:
+            headers["Server-Timing"] = trace.server_timing()
+        return jsonify(response_data), 200, headers
 
     except Exception as e:
         logger.error(f"Error in dual agent invocation: {str(e)}")
         return jsonify({"error": str(e)}), 400
 
+def stream_event(event: str, **payload) -> str:
+    """
+    Encodes one NDJSON line of the /invoke/stream protocol
+    """
+    return json.dumps({"event": event, **payload}) + "\n"
+
+def stream_cached(response_data: dict):
+    for stance in STANCES:
+        yield stream_event("stance", stance=stance, evidence=response_data[f"{stance}_evidence"], ok=True)
+    yield stream_event("complete", response=response_data)
+
+def stream_fact_check(query: str):
+    """
+    Yields the /invoke/stream events for a query: one "stance" event per
+    stance as soon as it finishes, then a "complete" event carrying the same
+    payload /invoke would have returned.
+    """
+    key = claim_key(query)
+    if claim_cache is not None:
+        cached = claim_cache.get(key)
+        if cached is not None:
+            yield from stream_cached(cached)
+            return
+
+    results = {}
+    failed = []
+    for stance, result, ok in iter_stances(query):
+        results[stance] = result
+        if not ok:
+            failed.append(stance)
+        yield stream_event("stance", stance=stance, evidence=evidence_dict(result), ok=ok)
+
+    response_data = build_response(query, results["supporting"], results["opposing"], failed)
+    if claim_cache is not None and not failed:
+        claim_cache.set(key, response_data)
+    yield stream_event("complete", response=response_data)
+
+@app.route('/invoke/stream', methods=['POST'])
+def invoke_dual_agents_stream():
+    """
+    Streaming variant of /invoke. Emits newline-delimited JSON events so
+    clients can render each stance while the other is still running.
+    """
+    try:
+        input_data = TavilySearchInput(**request.json)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        yield stream_event("start", query=input_data.query)
+        try:
+            with metrics.trace("invoke_stream"):
+                yield from stream_fact_check(input_data.query)
+        except Exception as e:
+            logger.error(f"Error in streaming dual agent invocation: {str(e)}")
+            yield stream_event("error", error=str(e))
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def verdict_with_sources(factuality, response: dict) -> FactCheckResult:
+    return FactCheckResult(
+        is_factual=factuality.is_factual,
+        confidence=factuality.confidence,
+        reasoning=factuality.reasoning,
+        sources=extract_sources(response.get("citations", []))
+    )
+
+def parse_verdict(response: dict) -> Optional[FactCheckResult]:
+    """
+    The agent's own JSON verdict with its sources, or None when the output
+    needs the fallback factuality prompt (see analyze_fallback)
+    """
+    with metrics.span("parse_verdict"):
+        factuality = parse_structured_output(response.get("output", ""))
+    return verdict_with_sources(factuality, response) if factuality is not None else None
+
+def analyze_fallback(responses: List[dict]) -> List[Optional[FactCheckResult]]:
+    """
+    Batched counterpart of parse_agent_response's fallback: agent outputs that
+    aren't a valid verdict share one factuality prompt. Outputs that can't be
+    analyzed at all get None.
+    """
+    metrics.count("verdict_fallbacks_total", len(responses))
+    with metrics.span("analyze_factuality_batch"):
+        factualities = analyze_factuality_batch([response.get("output", "") for response in responses], get_llm())
+    return [
+        verdict_with_sources(factuality, response) if factuality is not None else None
+        for factuality, response in zip(factualities, responses)
+    ]
+
+def iter_batch(claims: List[str], timeout: float = BATCH_TIMEOUT):
+    """
+    Fact-checks several claims, yielding each one as soon as both of its stances are analyzed.
+
+    Claims are de-duplicated on their cache key, cached claims are answered
+    immediately, and the remaining search agents run on batch_executor,
+    at most BATCH_CONCURRENCY at a time for this request. Each agent output is parsed as soon as its
+    run finishes, so a claim is yielded as soon as its second verdict is
+    known; only outputs without a valid verdict wait, to be analyzed in
+    groups of BATCH_ANALYSIS_SIZE per fallback LLM call.
+
+    Yields:
+        (key, response_data) once per unique claim
+    """
+    unique = {}
+    for claim in claims:
+        unique.setdefault(claim_key(claim), claim)
+
+    pending = {}
+    for key, claim in unique.items():
+        cached = claim_cache.get(key) if claim_cache is not None else None
+        if cached is not None:
+            yield key, cached
+        else:
+            pending[key] = {"claim": claim, "results": {}, "failed": []}
+
+    def run_agent(stance, claim):
+        with metrics.span("search_agent", stance=stance):
+            return get_search_agent(stance).invoke({"input": claim})
+
+    jobs = deque((key, stance) for key in pending for stance in STANCES)
+    futures = {}
+    waiting = []
+
+    def submit_jobs():
+        while jobs and len(futures) < BATCH_CONCURRENCY:
+            key, stance = jobs.popleft()
+            future = batch_executor.submit(contextvars.copy_context().run, run_agent, stance, pending[key]["claim"])
+            futures[future] = (key, stance)
+
+    def record_failure(key, stance, reason):
+        pending[key]["results"][stance] = stance_failure(stance, reason)
+        pending[key]["failed"].append(stance)
+
+    def flush(analyze_waiting: bool):
+        if analyze_waiting and waiting:
+            try:
+                analyses = analyze_fallback([response for _, _, response in waiting])
+            except Exception as e:
+                logger.error(f"Error analyzing batch: {e}")
+                for key, stance, _ in waiting:
+                    record_failure(key, stance, str(e))
+                analyses = []
+            for (key, stance, _), analysis in zip(waiting, analyses):
+                if analysis is None:
+                    record_failure(key, stance, "factuality analysis failed")
+                else:
+                    pending[key]["results"][stance] = analysis
+            waiting.clear()
+        finished = [key for key, entry in pending.items() if len(entry["results"]) == len(STANCES)]
+        for key in finished:
+            entry = pending.pop(key)
+            response_data = build_response(entry["claim"], entry["results"]["supporting"], entry["results"]["opposing"],
+                                           entry["failed"])
+            if claim_cache is not None and not entry["failed"]:
+                claim_cache.set(key, response_data)
+            yield key, response_data
+
+    deadline = time.monotonic() + timeout
+    submit_jobs()
+    while futures:
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            key, stance = futures.pop(future)
+            try:
+                response = future.result()
+                analysis = parse_verdict(response)
+                if analysis is None:
+                    waiting.append((key, stance, response))
+                else:
+                    pending[key]["results"][stance] = analysis
+            except Exception as e:
+                logger.error(f"Error in {stance} stance: {e}")
+                record_failure(key, stance, str(e))
+        submit_jobs()
+        # Fall back once a full group is waiting, or when nothing else is coming
+        yield from flush(len(waiting) >= BATCH_ANALYSIS_SIZE or not futures)
+
+    # Past the deadline: runs in flight are abandoned, queued ones never start
+    for future, (key, stance) in futures.items():
+        future.cancel()
+        record_failure(key, stance, f"timed out after {timeout:g}s")
+    for key, stance in jobs:
+        record_failure(key, stance, f"timed out after {timeout:g}s")
+    yield from flush(True)
+
+def parse_batch_claims(data) -> List[str]:
+    if isinstance(data, dict) and isinstance(data.get("text"), str) and "claims" not in data:
+        # Free text: fact-check only its check-worthy sentences
+        claims = extract_claims(data["text"], threshold=float(data.get("threshold", CLAIM_THRESHOLD)))
+        if not claims:
+            raise ValueError("No check-worthy claims found in 'text'")
+        return claims[:BATCH_MAX_CLAIMS]
+
+    claims = data.get("claims") if isinstance(data, dict) else None
+    if not isinstance(claims, list) or not claims:
+        raise ValueError("'claims' must be a non-empty list of strings")
+    if len(claims) > BATCH_MAX_CLAIMS:
+        raise ValueError(f"At most {BATCH_MAX_CLAIMS} claims per batch")
+    if not all(isinstance(claim, str) and claim.strip() for claim in claims):
+        raise ValueError("Every claim must be a non-empty string")
+    return claims
+
+@app.route('/invoke/batch', methods=['POST'])
+def invoke_batch():
+    """
+    Fact-checks a list of claims in one request.
+
+    Body: {"claims": [...], "stream": false}, or {"text": "..."} to have the
+    check-worthy claims extracted from free text first. Returns one result
+    per claim, in order; duplicate claims share a result. With "stream":
+    true, NDJSON "result" events are emitted as each unique claim finishes,
+    listing the input positions they answer.
+    """
+    try:
+        data = request.json
+        claims = parse_batch_claims(data)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    positions = {}
+    for index, claim in enumerate(claims):
+        positions.setdefault(claim_key(claim), []).append(index)
+
+    if data.get("stream"):
+        def generate():
+            yield stream_event("start", claims=claims, unique_claims=len(positions))
+            try:
+                with metrics.trace("invoke_batch"):
+                    for key, response_data in iter_batch(claims):
+                        yield stream_event("result", indices=positions[key], response=response_data)
+            except Exception as e:
+                logger.error(f"Error in streaming batch invocation: {str(e)}")
+                yield stream_event("error", error=str(e))
+                return
+            yield stream_event("complete")
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    try:
+        with metrics.trace("invoke_batch"):
+            by_key = dict(iter_batch(claims))
+        metrics.count("batch_claims_total", len(claims))
+        return jsonify({
+            "claims": claims,
+            "results": [by_key[claim_key(claim)] for claim in claims],
+            "unique_claims": len(positions)
+        }), 200
+    except Exception as e:
+        logger.error(f"Error in batch invocation: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/stats/clients', methods=['GET'])
+def client_stats():
+    return jsonify(registry.stats()), 200
+
+@app.route('/stats/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(claim_cache.stats() if claim_cache is not None else {"backend": "off"}), 200
+
+@app.route('/sources/<source_id>', methods=['GET'])
+def get_source(source_id):
+    """
+    Full text of a source whose content was truncated in a fact-check response
+    """
+    source = expand_source(source_id)
+    if source is None:
+        return jsonify({"error": "Source not found or expired"}), 404
+    return jsonify(source), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+def warm_up_agents():
+    for stance in STANCES:
+        get_search_agent(stance)
+
+# Build the LLM client and both stance agents before the first claim arrives
+warm_up(get_llm, warm_up_agents)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=3001)
\ No newline at end of file
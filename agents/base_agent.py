@@ -1,44 +1,22 @@
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict
-
-@dataclass
-class Message:
-    sender: str
-    receiver: str
-    message_type: str
-    content: Any
-    metadata: Dict = None
-    timestamp: str = None
-    message_id: str = None
-
-    def __post_init__(self):
-        self.timestamp = self.timestamp or datetime.now().isoformat()
-        self.message_id = self.message_id or f"{self.sender}-{self.timestamp}"
-
-    def to_dict(self) -> Dict:
-        return {
-            "message_id": self.message_id,
-            "sender": self.sender,
-            "receiver": self.receiver,
-            "message_type": self.message_type,
-            "content": self.content,
-            "metadata": self.metadata,
-            "timestamp": self.timestamp
-        }
+import logging
+from typing import Any
+from models.message import Message
 
 class BaseAgent:
-    def __init__(self, broker, agent_id):
+    def __init__(self, broker, agent_id, subscribe: bool = True):
         self.broker = broker
         self.agent_id = agent_id
-        broker.subscribe(agent_id, self.receive_message)
+        self.logger = logging.getLogger(agent_id)
+        if subscribe:
+            broker.subscribe(agent_id, self.receive_message)
 
-    def create_message(self, receiver: str, content: Any) -> Message:
+    def create_message(self, receiver: str, content: Any, correlation_id: str = None) -> Message:
         return Message(
             sender=self.agent_id,
             receiver=receiver,
             message_type="response",
-            content=content
+            content=content,
+            correlation_id=correlation_id
         )
 
     def receive_message(self, message: Message):
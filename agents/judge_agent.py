@@ -1,43 +1,52 @@
 from .base_agent import BaseAgent
-from dataclasses import dataclass
-from typing import Any, Dict
+from services.sources import normalize_sources
+
+SIDES = ("for", "against")
 
 class JudgeAgent(BaseAgent):
-    def __init__(self, broker, agent_id):
-        super().__init__(broker, agent_id)
-        self.results = {}
+    """
+    Merges the stance agents' replies once broker.scatter_gather has gathered
+    them. It is called directly rather than sent messages, so it takes no
+    inbox or worker threads on the broker.
+    """
+    def __init__(self, broker, agent_id="judge_agent"):
+        super().__init__(broker, agent_id, subscribe=False)
 
-    def receive_message(self, message):
-        """Handle incoming messages from other agents."""
-        if message.message_type == "response":
-            # Ensure content is treated properly
-            content = message.content  # Access the content attribute
-            if "for" in content:
-                self.results["for"] = content["for"]
-            elif "against" in content:
-                self.results["against"] = content["against"]
+    def judge(self, replies):
+        """
+        Merges the replies gathered from the stance agents; None stands for a
+        side that failed or missed the deadline.
+        """
+        sources = {}
+        for reply in replies:
+            if reply is None:
+                continue
+            for side in SIDES:
+                if side in reply.content:
+                    sources[side] = reply.content[side]["sources"]
+        return self.merge(sources)
 
-            # Combine results if both are available
-            if "for" in self.results and "against" in self.results:
-                combined_sources = (
-                    self.results["for"]["sources"] +
-                    self.results["against"]["sources"]
-                )
-                summary = self.generate_summary(
-                    for_sources=self.results["for"]["sources"],
-                    against_sources=self.results["against"]["sources"]
-                )
-                final_message = self.create_message(
-                    receiver="app",
-                    content={
-                        "summary": summary,
-                        "sources": combined_sources
-                    }
-                )
-                self.broker.send_message(final_message)
-        else:
-            self.logger.error("Unhandled message type.")
+    @classmethod
+    def merge(cls, sources):
+        """
+        Combines the sources of each side; sides missing from `sources` are
+        reported so callers can tell a partial verdict from a complete one.
+        Duplicates are collapsed within each side for the summary counts, then
+        across sides, where the content caps are applied, for the combined list.
+        """
+        for_sources = normalize_sources(sources.get("for", []), max_chars=0)
+        against_sources = normalize_sources(sources.get("against", []), max_chars=0)
+        result = {
+            "summary": cls.generate_summary(for_sources=for_sources, against_sources=against_sources),
+            "sources": normalize_sources(for_sources + against_sources)
+        }
+        missing = [side for side in SIDES if side not in sources]
+        if missing:
+            result["partial"] = True
+            result["missing"] = missing
+        return result
 
-    def generate_summary(self, for_sources, against_sources):
+    @staticmethod
+    def generate_summary(for_sources, against_sources):
         """Generate a summary based on sources."""
         return f"FOR: {len(for_sources)} sources, AGAINST: {len(against_sources)} sources."
@@ -1,19 +1,29 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from broker import MessageBroker
+from models.message import Message
 from agents.for_agent import ForAgent
 from agents.against_agent import AgainstAgent
 from agents.judge_agent import JudgeAgent
+from services import metrics
+from services.clients import get_search_tool, warm_up
+from services.compression import enable_compression
+from services.sources import expand_source
 import logging
+import os
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
+enable_compression(app)
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the stance agents before answering with partial results
+QUERY_TIMEOUT = float(os.environ.get("QUERY_TIMEOUT", 30))
+
 # Initialize the message broker
 broker = MessageBroker()
 
@@ -22,6 +32,9 @@ for_agent = ForAgent(broker)
 against_agent = AgainstAgent(broker)
 judge_agent = JudgeAgent(broker)
 
+# Import the Tavily tooling and open its client before the first query
+warm_up(get_search_tool)
+
 @app.route('/query', methods=['POST'])
 def handle_query():
     try:
@@ -31,17 +44,43 @@ def handle_query():
         if not query:
             return jsonify({"error": "Query is required"}), 400
 
-        # Send query to FOR and AGAINST agents
-        broker.send_message(for_agent.create_message("judge_agent", query))
-        broker.send_message(against_agent.create_message("judge_agent", query))
+        with metrics.trace("query") as trace:
+            # Ask the FOR and AGAINST agents concurrently and give both one shared deadline
+            correlation_id = broker.new_correlation_id()
+            with metrics.span("scatter_gather"):
+                replies = broker.scatter_gather([
+                    Message(
+                        sender="app",
+                        receiver=agent.agent_id,
+                        message_type="request",
+                        content=query,
+                        correlation_id=correlation_id
+                    )
+                    for agent in (for_agent, against_agent)
+                ], timeout=QUERY_TIMEOUT)
 
-        # Judge waits for both responses and evaluates
-        result = judge_agent.evaluate()
+            # Judge merges whatever arrived; a side that timed out is reported as missing
+            with metrics.span("judge"):
+                result = judge_agent.judge(replies)
+        if result.get("partial"):
+            metrics.count("partial_results_total", route="query")
 
-        return jsonify(result), 200
+        headers = {"Server-Timing": trace.server_timing()} if trace is not None else {}
+        return jsonify(result), 200, headers
     except Exception as e:
         logger.error(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/sources/<source_id>', methods=['GET'])
+def get_source(source_id):
+    source = expand_source(source_id)
+    if source is None:
+        return jsonify({"error": "Source not found or expired"}), 404
+    return jsonify(source), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=3001)
@@ -0,0 +1,206 @@
+"""
+Asyncio serving mode for the fact-check API.
+
+Serves /invoke (dual-agent fact check) and /query (for/against source search)
+from a single event loop. Run it under an ASGI server:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 3001
+
+MAX_CONCURRENT_CHECKS caps how many checks may call upstream APIs at once;
+requests that cannot get a slot within QUEUE_TIMEOUT seconds get a 503.
+
+Searches and factuality analyses are async, but the ReAct agents can only use
+Cohere's synchronous client, so every stance holds a thread for its agent
+run. Those run on a dedicated pool of ASYNC_STANCE_WORKERS threads, by
+default one per stance per slot. A stance that times out frees its slot but
+not its thread until the agent returns; while such threads are busy, newly
+admitted checks queue for the pool within their STANCE_TIMEOUT. The real
+ceiling is therefore ASYNC_STANCE_WORKERS concurrent agent runs.
+
+The claim and search caches and the source store may be SQLite-backed, so
+their reads and writes, and the response building that writes truncated
+sources to the store, run on the default executor rather than the loop.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from agent import (
+    STANCES, TavilySearchInput, build_response, claim_cache, claim_key, evidence_dict,
+    iter_stances_async, run_stances_async, stream_cached, stream_event
+)
+from agents.for_agent import ForAgent
+from agents.against_agent import AgainstAgent
+from agents.judge_agent import JudgeAgent
+from services.search import perform_search_async
+from services import metrics
+from services.cache import cache_get_async, cache_set_async
+from services.compression import COMPRESS_MIN_BYTES, COMPRESS_LEVEL
+from services.sources import expand_source
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_CHECKS = int(os.environ.get("MAX_CONCURRENT_CHECKS", "64"))
+QUEUE_TIMEOUT = float(os.environ.get("QUEUE_TIMEOUT", "5"))
+
+_slots = asyncio.Semaphore(MAX_CONCURRENT_CHECKS)
+stance_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ASYNC_STANCE_WORKERS", str(MAX_CONCURRENT_CHECKS * len(STANCES)))),
+    thread_name_prefix="asgi-stance"
+)
+
+class Overloaded(Exception):
+    pass
+
+class _Slot:
+    """
+    Holds one of the MAX_CONCURRENT_CHECKS upstream slots for the duration of a request
+    """
+    async def __aenter__(self):
+        try:
+            await asyncio.wait_for(_slots.acquire(), QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise Overloaded()
+
+    async def __aexit__(self, *exc):
+        _slots.release()
+
+async def off_loop(func, *args):
+    """
+    Runs blocking store I/O on the default executor
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+def overloaded_response():
+    return JSONResponse(
+        {"error": "Server is at capacity, retry shortly"},
+        status_code=503,
+        headers={"Retry-After": str(max(1, int(QUEUE_TIMEOUT)))}
+    )
+
+async def invoke(request: Request):
+    try:
+        data = await request.json()
+        input_data = TavilySearchInput(**data)
+
+        with metrics.trace("invoke") as trace:
+            key = claim_key(input_data.query)
+            if claim_cache is not None:
+                cached = await cache_get_async(claim_cache, key)
+                if cached is not None:
+                    metrics.count("claim_cache_total", result="hit")
+                    return JSONResponse(cached, headers={"X-Cache": "HIT"})
+                metrics.count("claim_cache_total", result="miss")
+
+            async with _Slot():
+                results, failed = await run_stances_async(input_data.query, executor=stance_executor)
+
+            response_data = await off_loop(build_response, input_data.query, results["supporting"], results["opposing"], failed)
+            if not failed:
+                await cache_set_async(claim_cache, key, response_data)
+        headers = {"X-Cache": "MISS"}
+        if trace is not None:
+            headers["Server-Timing"] = trace.server_timing()
+        return JSONResponse(response_data, headers=headers)
+
+    except Overloaded:
+        metrics.count("overloaded_total", route="invoke")
+        return overloaded_response()
+    except Exception as e:
+        logger.error(f"Error in dual agent invocation: {str(e)}")
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+async def invoke_stream(request: Request):
+    """
+    Streaming variant of /invoke; same NDJSON events as the Flask /invoke/stream route
+    """
+    try:
+        input_data = TavilySearchInput(**(await request.json()))
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    async def generate():
+        yield stream_event("start", query=input_data.query)
+        key = claim_key(input_data.query)
+        cached = await cache_get_async(claim_cache, key)
+        if cached is not None:
+            for line in stream_cached(cached):
+                yield line
+            return
+
+        try:
+            async with _Slot():
+                results = {}
+                failed = []
+                async for stance, result, ok in iter_stances_async(input_data.query, executor=stance_executor):
+                    results[stance] = result
+                    if not ok:
+                        failed.append(stance)
+                    yield stream_event("stance", stance=stance, evidence=evidence_dict(result), ok=ok)
+        except Overloaded:
+            yield stream_event("error", error="Server is at capacity, retry shortly")
+            return
+
+        response_data = await off_loop(build_response, input_data.query, results["supporting"], results["opposing"], failed)
+        if not failed:
+            await cache_set_async(claim_cache, key, response_data)
+        yield stream_event("complete", response=response_data)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+async def query(request: Request):
+    try:
+        data = await request.json()
+        query = data.get('query', '')
+
+        if not query:
+            return JSONResponse({"error": "Query is required"}, status_code=400)
+
+        with metrics.trace("query"):
+            async with _Slot():
+                for_sources, against_sources = await asyncio.gather(
+                    perform_search_async(ForAgent.query_template.format(query=query)),
+                    perform_search_async(AgainstAgent.query_template.format(query=query))
+                )
+
+        return JSONResponse(await off_loop(JudgeAgent.merge, {"for": for_sources, "against": against_sources}))
+    except Overloaded:
+        metrics.count("overloaded_total", route="query")
+        return overloaded_response()
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def get_source(request: Request):
+    source = await off_loop(expand_source, request.path_params["source_id"])
+    if source is None:
+        return JSONResponse({"error": "Source not found or expired"}, status_code=404)
+    return JSONResponse(source)
+
+async def prometheus_metrics(request: Request):
+    return Response(metrics.render(), headers={"Content-Type": metrics.PROMETHEUS_CONTENT_TYPE})
+
+app = Starlette(
+    routes=[
+        Route('/invoke', invoke, methods=['POST']),
+        Route('/invoke/stream', invoke_stream, methods=['POST']),
+        Route('/query', query, methods=['POST']),
+        Route('/sources/{source_id}', get_source, methods=['GET']),
+        Route('/metrics', prometheus_metrics, methods=['GET']),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+        # NDJSON events must reach the client as they are produced, not when the compressor flushes
+        Middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=COMPRESS_LEVEL,
+                   exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson",))
+    ]
+)
@@ -3,57 +3,97 @@ import numpy as np
 from pynput import keyboard
 import queue
 import threading
-import whisper
-from scipy.io import wavfile
-import tempfile
-import os
+from collections import deque
+from services.transcription import get_backend, preload
+from processing.vad import VoiceActivityDetector
 import subprocess
 import sys
 
+MIN_UPDATE_SECONDS = 2.0  # new audio gathered before each incremental transcription
+OVERLAP_SECONDS = 1.0  # tail of the previous window re-fed for context
+MAX_TRANSCRIPT_SEGMENTS = 200
+
+def _word_key(word):
+    return "".join(ch for ch in word.casefold() if ch.isalnum())
+
+def stitch_text(previous: str, new: str, max_overlap_words: int = 8) -> str:
+    """
+    Drops the words at the start of `new` that repeat the end of `previous`,
+    which happens when overlapping audio windows are transcribed separately
+    """
+    previous_words = [_word_key(word) for word in previous.split()[-max_overlap_words:]]
+    new_words = new.split()
+    new_keys = [_word_key(word) for word in new_words[:max_overlap_words]]
+    for size in range(min(len(previous_words), len(new_keys)), 0, -1):
+        if previous_words[-size:] == new_keys[:size]:
+            return " ".join(new_words[size:])
+    return new.strip()
+
 class AudioTranscriber:
     def __init__(self):
         self.recording = False
         self.audio_queue = queue.Queue()
-        self.model = whisper.load_model("base")
-        self.transcript = ""
+        # Bounded, segmented transcript; see the transcript property
+        self.segments = deque(maxlen=MAX_TRANSCRIPT_SEGMENTS)
         self.sample_rate = 16000
-        
+        self.vad = VoiceActivityDetector(self.sample_rate)
+        self._overlap = np.zeros(0, dtype=np.float32)
+        self._stopped = threading.Event()
+
+    @property
+    def backend(self):
+        # Loaded on a background thread by start(); the first transcription waits for it if needed
+        return get_backend("local", model_size="base")
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.segments)
+
     def audio_callback(self, indata, frames, time, status):
         if self.recording:
             self.audio_queue.put(indata.copy())
-    
+
     def process_audio(self):
-        while True:
-            if not self.recording and self.audio_queue.empty():
-                continue
-                
-            # Collect audio chunks
-            audio_data = []
+        pending = []
+        pending_frames = 0
+        min_frames = int(MIN_UPDATE_SECONDS * self.sample_rate)
+        while not self._stopped.is_set():
+            # Block until audio arrives instead of spinning while idle
             try:
-                while True:
-                    audio_data.append(self.audio_queue.get_nowait())
+                chunk = self.audio_queue.get(timeout=0.5)
+                pending.append(chunk)
+                pending_frames += len(chunk)
             except queue.Empty:
                 pass
-            
-            if len(audio_data) > 0:
-                # Combine audio chunks
-                audio = np.concatenate(audio_data)
-                
-                # Save temporary wav file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                    wavfile.write(temp_file.name, self.sample_rate, audio)
-                    
-                    # Transcribe
-                    result = self.model.transcribe(temp_file.name)
-                    
-                # Delete temporary file
-                os.unlink(temp_file.name)
-                
-                # Update transcript
-                if result["text"].strip():
-                    self.transcript += " " + result["text"].strip()
-                    print("\nTranscript so far:", self.transcript)
-    
+
+            # Transcribe once enough new audio has gathered, or flush when recording stops
+            if pending and (pending_frames >= min_frames or (not self.recording and self.audio_queue.empty())):
+                self.transcribe_increment(np.concatenate(pending).reshape(-1).astype(np.float32, copy=False))
+                pending = []
+                pending_frames = 0
+
+    def transcribe_increment(self, audio):
+        """
+        Transcribes only the new audio, prefixed by a short overlap with the
+        previous window, and appends the stitched text as a new segment
+        """
+        # Don't spend a transcription on silence or background noise
+        if not self.vad.contains_speech(audio):
+            self._overlap = np.zeros(0, dtype=np.float32)
+            return
+
+        window = np.concatenate([self._overlap, audio])
+        self._overlap = audio[-int(OVERLAP_SECONDS * self.sample_rate):]
+
+        text = self.backend.transcribe(window).strip()
+        if self.segments:
+            text = stitch_text(self.segments[-1], text)
+
+        # Update transcript
+        if text:
+            self.segments.append(text)
+            print("\nTranscript so far:", self.transcript)
+
     def on_press(self, key):
         try:
             # Check for Ctrl+M
@@ -68,6 +108,9 @@ class AudioTranscriber:
             pass
     
     def start(self):
+        # Load Whisper while the listener and audio stream come up
+        preload("local", model_size="base")
+
         # Start keyboard listener
         keyboard_listener = keyboard.Listener(on_press=self.on_press)
         keyboard_listener.start()
@@ -83,6 +126,7 @@ class AudioTranscriber:
                           samplerate=self.sample_rate):
             print("Press Ctrl+M to start/stop recording...")
             keyboard_listener.join()
+        self._stopped.set()
 
 if __name__ == "__main__":
     transcriber = AudioTranscriber()
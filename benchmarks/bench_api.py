@@ -0,0 +1,135 @@
+"""
+Load benchmark for the fact-checking HTTP endpoints against local API stand-ins.
+
+Starts benchmarks.stubs in a subprocess (so its CPU isn't billed to the app),
+points the Cohere/Tavily clients at it, serves the target app in-process and
+drives it with closed-loop HTTP load. CPU and RSS are those of this process:
+the app plus the load generator.
+
+    python -m benchmarks.bench_api [--target invoke] [--concurrency 8]
+                                   [--requests 200 | --duration 30] [--cache]
+                                   [--latency-ms 300] [--error-rate 0.01] ...
+
+Targets: invoke, invoke-stream, invoke-batch (agent.py), query (app.py),
+asgi-invoke (asgi.py, needs uvicorn).
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import requests
+from benchmarks.load import run_load, print_report
+from benchmarks.stubs import add_stub_arguments, stub_env
+
+# target -> (module, path, payload builder)
+TARGETS = {
+    "invoke": ("agent", "/invoke", lambda claims: {"query": claims[0]}),
+    "invoke-stream": ("agent", "/invoke/stream", lambda claims: {"query": claims[0]}),
+    "invoke-batch": ("agent", "/invoke/batch", lambda claims: {"claims": claims}),
+    "query": ("app", "/query", lambda claims: {"query": claims[0]}),
+    "asgi-invoke": ("asgi", "/invoke", lambda claims: {"query": claims[0]}),
+}
+
+def synthetic_claim(index: int) -> str:
+    return f"The city transit budget grew by {index % 90 + 5} percent in {1990 + index % 35}, claim {index}."
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_up(url: str, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def start_stubs(args):
+    """
+    Runs the stub server in a subprocess and returns (process, base_url)
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stubs", "--port", str(port),
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+         "--error-rate", str(args.error_rate), "--results", str(args.results),
+         "--content-bytes", str(args.content_bytes)],
+        stdout=subprocess.DEVNULL
+    )
+    wait_until_up(f"http://127.0.0.1:{port}/health")
+    os.environ.update(stub_env(port))
+    return process, f"http://127.0.0.1:{port}"
+
+def serve_app(module_name: str, port: int):
+    """
+    Imports the target app (after the stub environment is set) and serves it on a background thread
+    """
+    module = __import__(module_name)
+    if module_name == "asgi":
+        import uvicorn
+        server = uvicorn.Server(uvicorn.Config(module.app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+    else:
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", port, module.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return module
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), default="invoke")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=None, help="seconds; overrides --requests")
+    parser.add_argument("--batch-size", type=int, default=5, help="claims per invoke-batch request")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="cycle through this many distinct claims (0: every request is new)")
+    parser.add_argument("--cache", action="store_true", help="keep the claim and search caches enabled")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    if not args.cache:
+        os.environ.setdefault("CLAIM_CACHE", "off")
+        os.environ.setdefault("SEARCH_CACHE", "off")
+    stubs, stub_url = start_stubs(args)
+    try:
+        module_name, path, payload = TARGETS[args.target]
+        port = free_port()
+        serve_app(module_name, port)
+        url = f"http://127.0.0.1:{port}{path}"
+        wait_until_up(url)
+        sessions = threading.local()
+
+        def call(index):
+            if args.distinct:
+                index %= args.distinct
+            claims = [synthetic_claim(index * args.batch_size + offset) for offset in range(args.batch_size)]
+            session = getattr(sessions, "session", None) or requests.Session()
+            sessions.session = session
+            response = session.post(url, json=payload(claims), timeout=300)
+            response.raise_for_status()
+            for _ in response.iter_content(chunk_size=None):
+                pass  # read streamed bodies to the end
+
+        call(0)  # warm-up: builds agents and opens connections
+        result = run_load(args.target, call, concurrency=args.concurrency,
+                          requests=args.requests, duration=args.duration)
+        print_report([result], note=(
+            f"{args.target}: concurrency {args.concurrency}, stub latency {args.latency_ms:g}"
+            f"+/-{args.jitter_ms:g} ms, error rate {args.error_rate:g}, cache {'on' if args.cache else 'off'}"
+        ))
+        print(f"upstream calls: {requests.get(stub_url + '/stats').json()}")
+    finally:
+        stubs.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+End-to-end benchmark of the live audio pipeline against a local Groq stand-in.
+
+Plays WAV fixtures (or synthetic audio) into liveAudio's ring buffer the way
+the sounddevice callback would, runs the real segmentation, preprocessing
+and transcription pool, and reports capture-to-transcript latency per
+segment, segments/s and CPU/RSS of the process.
+
+    python -m benchmarks.bench_audio [--wav talk.wav ...] [--seconds 60] [--speed 4]
+                                     [--mode vad|fixed] [--latency-ms 300] ...
+
+--speed 1 plays in real time; 0 writes as fast as the pipeline accepts.
+Transcription settings come from the usual TRANSCRIBE_* variables.
+"""
+import argparse
+import bisect
+import contextlib
+import io
+import os
+import threading
+import time
+import wave
+import numpy as np
+from benchmarks.bench_api import start_stubs
+from benchmarks.bench_preprocess import synthetic_segment
+from benchmarks.load import LoadResult, cpu_seconds, rss_mb, peak_rss_mb, print_report
+from benchmarks.stubs import add_stub_arguments
+
+def load_wav(path: str, rate: int, channels: int) -> np.ndarray:
+    """
+    Reads a 16-bit PCM WAV as float32 frames, resampled and channel-matched to the capture format
+    """
+    with wave.open(path, "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        source_rate = wav_file.getframerate()
+        source_channels = wav_file.getnchannels()
+        audio = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+    audio = audio.reshape(-1, source_channels).astype(np.float32) / 32768.0
+    if source_rate != rate:
+        positions = np.arange(int(len(audio) * rate / source_rate)) * source_rate / rate
+        audio = np.stack([np.interp(positions, np.arange(len(audio)), audio[:, channel])
+                          for channel in range(source_channels)], axis=1).astype(np.float32)
+    if source_channels != channels:
+        audio = np.repeat(audio.mean(axis=1, keepdims=True), channels, axis=1)
+    return audio
+
+def speech_like(seconds: float, rate: int, channels: int) -> np.ndarray:
+    """
+    Synthetic voiced bursts separated by pauses so the VAD has utterances to cut
+    """
+    audio = synthetic_segment(seconds, rate, channels)
+    t = np.arange(len(audio)) / rate
+    # ~4 s of "speech" then ~1 s of quiet
+    envelope = np.where((t % 5) < 4, 1.0, 0.01).astype(np.float32)
+    return audio * envelope[:, None]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--wav", nargs="*", default=[], help="16-bit PCM WAV fixtures to play in order")
+    parser.add_argument("--seconds", type=float, default=60, help="synthetic audio length without --wav")
+    parser.add_argument("--speed", type=float, default=4, help="playback speed; 0 for as fast as possible")
+    parser.add_argument("--mode", choices=("vad", "fixed"), default=None, help="SEGMENT_MODE override")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    stubs, _ = start_stubs(args)
+    os.environ["TRANSCRIPTION_BACKEND"] = "groq"
+    if args.mode:
+        os.environ["SEGMENT_MODE"] = args.mode
+
+    import liveAudio
+
+    # Time from the end of each captured segment to its transcript being published.
+    # Segment times follow the audio clock, which runs --speed times faster than
+    # the wall clock, so latency is measured from when the segment's last frame was written.
+    result = LoadResult(f"audio-{liveAudio.SEGMENT_MODE}")
+    publish = liveAudio.append_transcript
+    written_frames = []
+    written_at = []
+
+    def timed_append(item):
+        _, _, end = item
+        frame = round((end - liveAudio.audio_ring.started_at) * liveAudio.RATE)
+        index = min(bisect.bisect_left(written_frames, frame), len(written_at) - 1)
+        result.latencies.append(time.time() - written_at[index])
+        with contextlib.redirect_stdout(io.StringIO()):
+            publish(item)
+
+    liveAudio.append_transcript = timed_append
+    pool = liveAudio.start_transcription()
+
+    if args.wav:
+        audio = np.concatenate([load_wav(path, liveAudio.RATE, liveAudio.CHANNELS) for path in args.wav])
+    else:
+        audio = speech_like(args.seconds, liveAudio.RATE, liveAudio.CHANNELS)
+    # Trailing quiet lets the segmenter close the last utterance
+    audio = np.concatenate([audio, np.zeros((liveAudio.RATE * 2, liveAudio.CHANNELS), dtype=np.float32)])
+
+    capture = threading.Thread(target=liveAudio.capture_segments, daemon=True)
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    capture.start()
+
+    # Write CHUNK-sized blocks like the stream callback, paced by --speed
+    for offset in range(0, len(audio), liveAudio.CHUNK):
+        liveAudio.audio_ring.write(audio[offset:offset + liveAudio.CHUNK])
+        written_frames.append(min(offset + liveAudio.CHUNK, len(audio)))
+        written_at.append(time.time())
+        if args.speed:
+            target = started + (offset + liveAudio.CHUNK) / liveAudio.RATE / args.speed
+            time.sleep(max(0.0, target - time.perf_counter()))
+
+    # Let the capture loop consume every full read before closing the buffer
+    read_seconds = liveAudio.VAD_BLOCK_SECONDS if liveAudio.SEGMENT_MODE == "vad" else liveAudio.SEGMENT_DURATION
+    while liveAudio.audio_ring.stats()["frames_buffered"] >= int(liveAudio.RATE * read_seconds):
+        time.sleep(0.05)
+    liveAudio.audio_ring.close()
+    capture.join()
+
+    # Drain the transcription pool
+    while True:
+        stats = pool.stats()
+        if stats["submitted"] == stats["completed"] + stats["dropped"] + stats["errors"] and not stats["awaiting_order"]:
+            break
+        time.sleep(0.05)
+
+    result.errors = stats["errors"] + stats["delivery_errors"] + stats["dropped"]
+    result.wall_seconds = time.perf_counter() - started
+    result.cpu_seconds = cpu_seconds() - cpu_before
+    result.rss_mb = rss_mb()
+    result.peak_rss_mb = peak_rss_mb()
+
+    audio_seconds = len(audio) / liveAudio.RATE
+    print_report([result], note=(
+        f"{audio_seconds:.0f}s of audio at {f'{args.speed:g}x' if args.speed else 'max'} speed, {pool.stats()['workers']} workers, "
+        f"stub latency {args.latency_ms:g}+/-{args.jitter_ms:g} ms (latency = capture end to transcript)"
+    ))
+    print(f"real-time factor: {result.wall_seconds / audio_seconds:.3f}  "
+          f"queue wait p95: {stats['queue_wait_p95']}  dropped: {stats['dropped']}  "
+          f"ring overflows: {liveAudio.audio_ring.stats()['dropped_frames']} frames")
+    stubs.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Cold-start benchmark for the entry points.
+
+Launches each entry point in a fresh interpreter (against the local API
+stand-ins) and reports how long it takes to import, to accept HTTP
+connections, and to be ready: the first real request answered, or for
+liveAudio the first segment preprocessed and transcribed. Also reports the
+modules loaded by the import and the RSS at readiness.
+
+    python -m benchmarks.bench_startup [--target agent app ...] [--repeat 3]
+                                       [--warm-up background|blocking|off]
+
+--warm-up sets CLIENT_WARM_UP and TRANSCRIBE_PRELOAD in the children.
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import requests
+from benchmarks.bench_api import free_port, serve_app, start_stubs, synthetic_claim, wait_until_up
+from benchmarks.load import rss_mb
+from benchmarks.stubs import add_stub_arguments
+from processing.ordered_pool import percentile
+
+# target -> (module, request that proves readiness as (path, payload), or None)
+TARGETS = {
+    "agent": ("agent", ("/invoke", {"query": synthetic_claim(0)})),
+    "app": ("app", ("/query", {"query": synthetic_claim(0)})),
+    "asgi": ("asgi", ("/invoke", {"query": synthetic_claim(0)})),
+    "liveAudio": ("liveAudio", None),
+    "audio": ("audio", None),
+    "youtube": ("youtube", None),
+}
+HTTP_TARGETS = ("agent", "app", "asgi", "liveAudio")
+COLUMNS = ("import_ms", "serving_ms", "ready_ms", "modules", "rss_mb")
+
+def first_transcript(module):
+    """
+    Pushes one second of audio through liveAudio's preprocessing and transcription
+    """
+    import numpy as np
+    module.start_transcription()
+    audio = np.zeros((module.RATE, module.CHANNELS), dtype=np.float32)
+    module.process_audio((module.preprocessor.process(audio), 0.0, 1.0))
+
+def measure(target: str) -> dict:
+    """
+    Runs in the child interpreter; times are milliseconds since the import started
+    """
+    module_name, ready_request = TARGETS[target]
+    modules_before = len(sys.modules)
+    started = time.perf_counter()
+    def elapsed():
+        return (time.perf_counter() - started) * 1000
+
+    module = importlib.import_module(module_name)
+    row = {"import_ms": elapsed(), "modules": len(sys.modules) - modules_before}
+
+    if target in HTTP_TARGETS:
+        port = free_port()
+        serve_app(module_name, port)
+        base_url = f"http://127.0.0.1:{port}"
+        wait_until_up(base_url + "/metrics")
+        row["serving_ms"] = elapsed()
+
+    if ready_request:
+        path, payload = ready_request
+        requests.post(base_url + path, json=payload, timeout=300).raise_for_status()
+        row["ready_ms"] = elapsed()
+    elif target == "liveAudio":
+        first_transcript(module)
+        row["ready_ms"] = elapsed()
+
+    row["rss_mb"] = rss_mb()
+    # Let warm-up threads finish so their errors don't end up in the report
+    for thread in threading.enumerate():
+        if thread.daemon and ("warm-up" in thread.name or "preload" in thread.name):
+            thread.join(30)
+    return row
+
+def run_child(target: str, warm_up: str) -> dict:
+    env = dict(os.environ, CLIENT_WARM_UP=warm_up, TRANSCRIBE_PRELOAD=warm_up,
+               TRANSCRIPTION_BACKEND="groq", CLAIM_CACHE="off", SEARCH_CACHE="off")
+    completed = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", target],
+                               env=env, capture_output=True, text=True, timeout=600)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = completed.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"exit code {completed.returncode}"}
+    return json.loads(lines[-1])
+
+def summarize(rows):
+    """
+    Median of each column over the successful runs
+    """
+    summary = {}
+    for column in COLUMNS:
+        values = sorted(row[column] for row in rows if row.get(column) is not None)
+        summary[column] = percentile(values, 0.5)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", nargs="*", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per target")
+    parser.add_argument("--warm-up", choices=("background", "blocking", "off"), default="background")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return
+
+    stubs, _ = start_stubs(args)
+    try:
+        print(f"cold starts: {args.repeat} per target, warm-up {args.warm_up}, "
+              f"stub latency {args.latency_ms:g}+/-{args.jitter_ms:g} ms (ms since the import started)")
+        print(f"{'entry point':<12}" + "".join(f"{column:>12}" for column in COLUMNS))
+        for target in args.target:
+            rows = [run_child(target, args.warm_up) for _ in range(args.repeat)]
+            errors = [row["error"] for row in rows if "error" in row]
+            if len(errors) == len(rows):
+                print(f"{target:<12}  failed: {errors[0]}")
+                continue
+            summary = summarize([row for row in rows if "error" not in row])
+            cells = [f"{'-':>12}" if value is None else f"{value:>12.0f}" if column != "rss_mb" else f"{value:>12.1f}"
+                     for column, value in summary.items()]
+            print(f"{target:<12}" + "".join(cells) + (f"  ({len(errors)} failed)" if errors else ""))
+    finally:
+        stubs.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Closed-loop load driver and reporting shared by the benchmarks.
+"""
+import itertools
+import os
+import resource
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List
+from processing.ordered_pool import percentile
+
+@dataclass
+class LoadResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rss_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": self.requests / self.wall_seconds if self.wall_seconds else 0.0,
+            "p50_ms": _ms(percentile(latencies, 0.5)),
+            "p95_ms": _ms(percentile(latencies, 0.95)),
+            "p99_ms": _ms(percentile(latencies, 0.99)),
+            "max_ms": _ms(latencies[-1] if latencies else None),
+            "cpu_seconds": self.cpu_seconds,
+            "cpu_percent": 100 * self.cpu_seconds / self.wall_seconds if self.wall_seconds else 0.0,
+            "rss_mb": self.rss_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def rss_mb() -> float:
+    """
+    Current resident set size; falls back to the peak where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if os.uname().sysname == "Darwin" else peak / 2 ** 10
+
+def run_load(name: str, call: Callable[[int], None], concurrency: int = 8,
+             requests: int = None, duration: float = None) -> LoadResult:
+    """
+    Runs `call(i)` from `concurrency` threads, each issuing its next request as
+    soon as the previous one returns, until `requests` calls were made or
+    `duration` seconds passed. An exception counts as an error.
+    """
+    if requests is None and duration is None:
+        raise ValueError("Either requests or duration is required")
+
+    result = LoadResult(name)
+    lock = threading.Lock()
+    counter = iter(range(requests)) if requests is not None else itertools.count()
+    deadline = None if duration is None else time.monotonic() + duration
+
+    def worker():
+        while deadline is None or time.monotonic() < deadline:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            try:
+                call(index)
+                ok = True
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    result.latencies.append(elapsed)
+                else:
+                    result.errors += 1
+
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"load-{index}", daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.wall_seconds = time.perf_counter() - started
+    result.cpu_seconds = cpu_seconds() - cpu_before
+    result.rss_mb = rss_mb()
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+COLUMNS = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "cpu_percent", "rss_mb")
+
+def print_report(results, note: str = ""):
+    """
+    Prints one row per LoadResult
+    """
+    if note:
+        print(note)
+    print(f"{'benchmark':<20}" + "".join(f"{column:>12}" for column in COLUMNS))
+    for result in results:
+        summary = result.summary()
+        cells = []
+        for column in COLUMNS:
+            value = summary[column]
+            cells.append(f"{'-':>12}" if value is None else
+                         f"{value:>12}" if isinstance(value, int) else f"{value:>12.1f}")
+        print(f"{summary['name']:<20}" + "".join(cells))
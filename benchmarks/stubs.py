@@ -0,0 +1,238 @@
+"""
+Local stand-ins for the Cohere, Tavily and Groq APIs.
+
+Serves just enough of each API for the apps to run end to end without
+network access or API keys, with configurable latency, error rate and
+payload size. Point the apps at it with the variables printed on startup.
+
+    python -m benchmarks.stubs [--port 8900] [--latency-ms 300] [--jitter-ms 100]
+                               [--error-rate 0.01] [--results 5] [--content-bytes 800]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 300  # mean added latency per call
+    jitter_ms: float = 100  # uniform +/- around the mean
+    error_rate: float = 0.0  # fraction of calls answered with HTTP 500
+    results: int = 5  # search results per query
+    content_bytes: int = 800  # size of each search result's content
+    transcript_words: int = 12  # words per transcribed segment
+
+    def delay(self):
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+    def should_fail(self):
+        return random.random() < self.error_rate
+
+FILLER_WORDS = ("the report says that about forty percent of the city budget went to transit "
+                "while officials claimed the program was the largest ever funded in the state").split()
+
+def verdict_json(text: str) -> str:
+    # Deterministic per claim so repeated runs produce the same answers
+    rng = random.Random(text)
+    return json.dumps({
+        "is_factual": rng.random() < 0.5,
+        "confidence": round(rng.uniform(0.5, 0.95), 2),
+        "reasoning": "Stub verdict based on the stub search results."
+    })
+
+def cohere_text(prompt: str) -> str:
+    """
+    Reply text for a Cohere call: a ReAct search action on the first turn of
+    the multi-hop agent, a cited JSON answer once search results are in the
+    prompt, and a bare verdict (list) for the factuality prompts
+    """
+    if "<results>" in prompt:
+        documents = sorted(set(re.findall(r"Document: (\d+)", prompt)), key=int) or ["0"]
+        cited = ",".join(documents)
+        verdict = verdict_json(prompt[:200])
+        return (f"Relevant Documents: {cited}\nCited Documents: {cited}\n"
+                f"Answer: {verdict}\nGrounded answer: <co: {cited}>{verdict}</co: {cited}>")
+    if "internet_search" in prompt:
+        query = re.search(r"User query: (.*)", prompt)
+        action = [{"tool_name": "internet_search",
+                   "parameters": {"query": query.group(1).strip() if query else "claim"}}]
+        return f"Plan: I will search for evidence.\nAction: ```json\n{json.dumps(action)}\n```"
+    texts = re.findall(r"^\s*\[(\d+)\]", prompt, re.M)
+    if texts:
+        return json.dumps([dict(json.loads(verdict_json(index)), index=int(index)) for index in texts])
+    return verdict_json(prompt)
+
+class StubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+    counts = {}
+    counts_lock = threading.Lock()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, key):
+        with self.counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(200, {"ok": True})
+        if self.path == "/stats":
+            with self.counts_lock:
+                return self._send(200, dict(self.counts))
+        self._send(404, {"message": "not found"})
+
+    def do_POST(self):
+        body = self._read_body()
+        routes = {
+            "/v1/chat": self.cohere_v1_chat,
+            "/v2/chat": self.cohere_v2_chat,
+            "/search": self.tavily_search,
+            "/openai/v1/audio/transcriptions": self.groq_transcription,
+        }
+        handler = routes.get(self.path.split("?")[0])
+        if handler is None:
+            return self._send(404, {"message": f"no stub for {self.path}"})
+
+        self._count(self.path)
+        self.config.delay()
+        if self.config.should_fail():
+            self._count("errors")
+            return self._send(500, {"message": "stub injected error"})
+        handler(body)
+
+    def cohere_v1_chat(self, body):
+        request = json.loads(body)
+        text = cohere_text(request.get("message", ""))
+        response = {
+            "response_id": uuid.uuid4().hex, "generation_id": uuid.uuid4().hex, "text": text,
+            "finish_reason": "COMPLETE", "chat_history": [],
+            "meta": {"billed_units": {"input_tokens": 100, "output_tokens": len(text.split())}}
+        }
+        if not request.get("stream"):
+            return self._send(200, response)
+        # The v1 SDK reads streams as newline-delimited JSON events
+        events = [
+            {"event_type": "stream-start", "generation_id": response["generation_id"], "is_finished": False},
+            {"event_type": "text-generation", "text": text, "is_finished": False},
+            {"event_type": "stream-end", "finish_reason": "COMPLETE", "response": response, "is_finished": True},
+        ]
+        self._send(200, "".join(json.dumps(event) + "\n" for event in events).encode(), "application/stream+json")
+
+    def cohere_v2_chat(self, body):
+        request = json.loads(body)
+        prompt = "\n".join(
+            message["content"] if isinstance(message.get("content"), str)
+            else " ".join(part.get("text", "") for part in message.get("content") or [])
+            for message in request.get("messages", [])
+        )
+        text = cohere_text(prompt)
+        message = {"role": "assistant", "content": [{"type": "text", "text": text}]}
+        usage = {"billed_units": {"input_tokens": 100, "output_tokens": len(text.split())},
+                 "tokens": {"input_tokens": 100, "output_tokens": len(text.split())}}
+        response_id = uuid.uuid4().hex
+        if not request.get("stream"):
+            return self._send(200, {"id": response_id, "finish_reason": "COMPLETE", "message": message, "usage": usage})
+        # The v2 SDK reads streams as server-sent events
+        events = [
+            {"type": "message-start", "id": response_id, "delta": {"message": {"role": "assistant"}}},
+            {"type": "content-start", "index": 0, "delta": {"message": {"content": {"type": "text", "text": ""}}}},
+            {"type": "content-delta", "index": 0, "delta": {"message": {"content": {"text": text}}}},
+            {"type": "content-end", "index": 0},
+            {"type": "message-end", "delta": {"finish_reason": "COMPLETE", "usage": usage}},
+        ]
+        self._send(200, "".join(f"data: {json.dumps(event)}\n\n" for event in events).encode() + b"data: [DONE]\n\n",
+                   "text/event-stream")
+
+    def tavily_search(self, body):
+        query = json.loads(body).get("query", "")
+        rng = random.Random(query)
+        filler = " ".join(rng.choice(FILLER_WORDS) for _ in range(self.config.content_bytes // 5))
+        results = [
+            {
+                "title": f"Result {index} for {query[:40]}",
+                "url": f"https://stub.example/{rng.randrange(10 ** 6)}/{index}",
+                "content": filler[:self.config.content_bytes],
+                "score": round(1 - index / (self.config.results + 1), 3),
+                "raw_content": None
+            }
+            for index in range(self.config.results)
+        ]
+        self._send(200, {"query": query, "answer": "Stub answer.", "images": [], "results": results,
+                         "response_time": self.config.latency_ms / 1000})
+
+    def groq_transcription(self, body):
+        words = [random.choice(FILLER_WORDS) for _ in range(self.config.transcript_words)]
+        self._send(200, {"text": " ".join(words).capitalize() + ".", "x_groq": {"id": uuid.uuid4().hex}})
+
+def stub_env(port: int, host: str = "127.0.0.1") -> dict:
+    """
+    Environment that points the apps at a stub server on `port`
+    """
+    base_url = f"http://{host}:{port}"
+    return {
+        "COHERE_BASE_URL": base_url,
+        "COHERE_API_KEY": "stub",
+        "TAVILY_BASE_URL": base_url,
+        "TAVILY_API_KEY": "stub",
+        "GROQ_BASE_URL": base_url,
+        "GROQ_API_KEY": "stub",
+    }
+
+def serve(config: StubConfig, port: int = 8900, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Starts a stub server on a background thread and returns it
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config, "counts": {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=StubConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=StubConfig.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=StubConfig.error_rate)
+    parser.add_argument("--results", type=int, default=StubConfig.results, help="search results per query")
+    parser.add_argument("--content-bytes", type=int, default=StubConfig.content_bytes,
+                        help="size of each search result")
+
+def config_from_args(args) -> StubConfig:
+    return StubConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                      results=args.results, content_bytes=args.content_bytes)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--host", default="127.0.0.1")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = serve(config_from_args(args), args.port, args.host)
+    for name, value in stub_env(args.port, args.host).items():
+        print(f"export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
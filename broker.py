@@ -1,22 +1,178 @@
-from datetime import datetime
-from models.message import Message
+import contextvars
 import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from services import metrics
+
+class InboxFull(Exception):
+    """Raised when a receiver's bounded inbox stays full past the send timeout."""
+
+class _Envelope:
+    __slots__ = ("message", "future", "context")
+
+    def __init__(self, message, future=None):
+        self.message = message
+        self.future = future
+        # The agent runs in the sender's context, so its spans join the sender's trace
+        self.context = contextvars.copy_context()
 
 class MessageBroker:
-    def __init__(self):
-        self.message_log = []
+    """
+    Asynchronous message broker.
+
+    Each subscribed agent gets a bounded inbox drained by its own worker
+    threads, so senders never run agent code on their own thread. Replies
+    returned by a callback are either routed on to their receiver
+    (send_message) or handed back to the requester through a Future
+    (request / scatter_gather). Every message carries a correlation id so
+    agents can keep request-scoped state. The message log is capped and can
+    be rotated out to a JSON-lines file.
+    """
+    def __init__(self, inbox_size: int = 100, workers_per_agent: int = 4,
+                 log_size: int = 1000, send_timeout: float = 5):
+        self.inbox_size = inbox_size
+        self.workers_per_agent = workers_per_agent
+        self.send_timeout = send_timeout
+        self.message_log = deque(maxlen=log_size)
         self.subscribers = {}
+        self._inboxes = {}
+        self._log_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
+        metrics.gauge(
+            "broker_inbox_depth",
+            lambda: {(("agent", agent_id),): inbox.qsize() for agent_id, inbox in self._inboxes.items()},
+            help="Messages waiting in each agent's inbox"
+        )
 
-    def subscribe(self, agent_id, callback):
+    @staticmethod
+    def new_correlation_id() -> str:
+        return uuid.uuid4().hex
+
+    def subscribe(self, agent_id, callback, workers: int = None, inbox_size: int = None):
         """Subscribe an agent to receive messages."""
         self.subscribers[agent_id] = callback
+        inbox = queue.Queue(maxsize=inbox_size or self.inbox_size)
+        self._inboxes[agent_id] = inbox
+        for index in range(workers or self.workers_per_agent):
+            threading.Thread(
+                target=self._drain, args=(agent_id, inbox), name=f"{agent_id}-{index}", daemon=True
+            ).start()
 
     def send_message(self, message):
-        """Send a message to a specific receiver."""
-        self.message_log.append(message)
-        if message.receiver in self.subscribers:
-            return self.subscribers[message.receiver](message)
-        else:
+        """Queue a message for its receiver; any reply is routed on to the reply's receiver."""
+        return self._enqueue(message, None)
+
+    def request(self, message) -> Future:
+        """Queue a message and return a Future resolved with the receiver's reply."""
+        future = Future()
+        self._enqueue(message, future)
+        return future
+
+    def scatter_gather(self, messages, timeout: float = None):
+        """
+        Sends several requests at once and waits for their replies until a shared deadline.
+
+        Returns:
+            list of replies in the order of `messages`; None for requests that
+            failed, were rejected or missed the deadline
+        """
+        futures = []
+        for message in messages:
+            try:
+                futures.append(self.request(message))
+            except InboxFull as e:
+                self.logger.warning(str(e))
+                futures.append(None)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        replies = []
+        for message, future in zip(messages, futures):
+            if future is None:
+                replies.append(None)
+                continue
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                replies.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                future.cancel()
+                self.logger.warning(f"No reply from {message.receiver} within {timeout}s")
+                replies.append(None)
+            except Exception as e:
+                self.logger.error(f"Request to {message.receiver} failed: {e}")
+                replies.append(None)
+        return replies
+
+    def _enqueue(self, message, future):
+        self._log(message)
+        inbox = self._inboxes.get(message.receiver)
+        if inbox is None:
             self.logger.warning(f"No subscriber found for {message.receiver}")
+            if future is not None:
+                future.set_exception(LookupError(f"No subscriber found for {message.receiver}"))
             return None
+        try:
+            inbox.put(_Envelope(message, future), timeout=self.send_timeout)
+        except queue.Full:
+            metrics.count("broker_rejected_total", agent=message.receiver)
+            raise InboxFull(f"Inbox of {message.receiver} is full")
+        return None
+
+    def _drain(self, agent_id, inbox):
+        callback = self.subscribers[agent_id]
+        while True:
+            envelope = inbox.get()
+            message, future = envelope.message, envelope.future
+            if future is not None and not future.set_running_or_notify_cancel():
+                continue  # requester gave up before we started
+            try:
+                reply = envelope.context.run(self._handle, agent_id, callback, message)
+            except Exception as e:
+                self.logger.error(f"Error in {agent_id} handling {message.message_id}: {e}")
+                if future is not None:
+                    future.set_exception(e)
+                continue
+
+            if reply is not None and reply.correlation_id is None:
+                reply = reply.with_correlation(message.correlation_id)
+            if future is not None:
+                if reply is not None:
+                    self._log(reply)
+                future.set_result(reply)
+            elif reply is not None:
+                try:
+                    self.send_message(reply)
+                except InboxFull as e:
+                    self.logger.error(f"Dropping reply from {agent_id}: {e}")
+
+    @staticmethod
+    def _handle(agent_id, callback, message):
+        with metrics.span("agent_message", agent=agent_id):
+            return callback(message)
+
+    def _log(self, message):
+        with self._log_lock:
+            self.message_log.append(message)
+
+    def rotate_log(self, path: str = None):
+        """
+        Empties the message log, appending its entries to `path` as JSON lines
+        if given, and returns the rotated messages.
+        """
+        with self._log_lock:
+            messages = list(self.message_log)
+            self.message_log.clear()
+        if path:
+            with open(path, "ab") as log_file:
+                for message in messages:
+                    log_file.write(message.to_json() + b"\n")
+        return messages
+
+    def stats(self):
+        return {
+            "logged_messages": len(self.message_log),
+            "inboxes": {agent_id: inbox.qsize() for agent_id, inbox in self._inboxes.items()}
+        }
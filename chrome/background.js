@@ -95,7 +95,7 @@ async function showLoadingModal(tab, text) {
   });
 }
 
-async function showResults(tab, data) {
+async function injectResultsCSS(tab) {
   await chrome.scripting.insertCSS({
     target: { tabId: tab.id },
     css: `
@@ -129,85 +129,261 @@ async function showResults(tab, data) {
       .fact-check-source-link:hover {
         text-decoration: underline;
       }
+
+      .fact-check-source-more {
+        color: #2196F3;
+        font-size: 0.9em;
+      }
+
+      .fact-check-source-also {
+        color: #757575;
+        font-size: 0.85em;
+      }
     `,
   });
+}
 
+// Renders whatever part of the response has arrived so far; stances that are
+// still running are shown with a spinner.
+async function showResults(tab, data) {
   await chrome.scripting.executeScript({
     target: { tabId: tab.id },
     func: (responseData) => {
       const overlay = document.getElementById("fact-check-overlay");
+      if (!overlay) return;
       const modal = overlay.querySelector(".fact-check-modal");
 
-      modal.innerHTML = `
-        <div style="position: relative;">
-          <div class="fact-check-close" onclick="document.getElementById('fact-check-overlay').remove()">&times;</div>
-          
-          <div class="fact-check-section">
-            <div class="fact-check-heading">Original Text</div>
-            <div style="white-space: pre-wrap;">${responseData.query}</div>
-          </div>
-
+      const renderEvidence = (title, evidence) => {
+        if (!evidence) {
+          return `
+            <div class="fact-check-section">
+              <div class="fact-check-heading">${title}</div>
+              <div class="fact-check-loading">
+                <div class="fact-check-spinner"></div>
+              </div>
+            </div>
+          `;
+        }
+        return `
           <div class="fact-check-section">
-            <div class="fact-check-heading">Supporting Evidence</div>
-            <div class="fact-check-analysis ${responseData.supporting_evidence.is_factual ? "factual" : "not-factual"}">
-              Verdict: ${responseData.supporting_evidence.is_factual ? "Factual" : "Not Factual"}
+            <div class="fact-check-heading">${title}</div>
+            <div class="fact-check-analysis ${evidence.is_factual ? "factual" : "not-factual"}">
+              Verdict: ${evidence.is_factual ? "Factual" : "Not Factual"}
             </div>
             <div style="margin-top: 8px;">
-              <strong>Confidence:</strong> ${(responseData.supporting_evidence.confidence * 100).toFixed(1)}%
+              <strong>Confidence:</strong> ${(evidence.confidence * 100).toFixed(1)}%
             </div>
             <div style="margin-top: 8px;">
-              <strong>Reasoning:</strong> ${responseData.supporting_evidence.reasoning}
+              <strong>Reasoning:</strong> ${evidence.reasoning}
             </div>
             <div class="fact-check-section">
               <div class="fact-check-heading">Sources</div>
               <div class="fact-check-sources">
-                ${responseData.supporting_evidence.sources.map(source => `
+                ${evidence.sources.map(source => `
                   <div class="fact-check-source">
                     <a href="${source.url}" target="_blank" class="fact-check-source-link">
                       ${source.url}
                     </a>
-                    <p>${source.content}</p>
+                    <p>${source.content}${source.truncated && source.id
+                      ? ` <a href="#" class="fact-check-source-more" data-source-id="${source.id}">more</a>` : ""}</p>
+                    ${source.also_at ? `<div class="fact-check-source-also">Also at ${source.also_at.length} other site${source.also_at.length > 1 ? "s" : ""}</div>` : ""}
                   </div>
                 `).join("")}
               </div>
             </div>
           </div>
+        `;
+      };
 
+      modal.innerHTML = `
+        <div style="position: relative;">
+          <div class="fact-check-close" onclick="document.getElementById('fact-check-overlay').remove()">&times;</div>
+          
           <div class="fact-check-section">
-            <div class="fact-check-heading">Opposing Evidence</div>
-            <div class="fact-check-analysis ${responseData.opposing_evidence.is_factual ? "factual" : "not-factual"}">
-              Verdict: ${responseData.opposing_evidence.is_factual ? "Factual" : "Not Factual"}
-            </div>
-            <div style="margin-top: 8px;">
-              <strong>Confidence:</strong> ${(responseData.opposing_evidence.confidence * 100).toFixed(1)}%
-            </div>
-            <div style="margin-top: 8px;">
-              <strong>Reasoning:</strong> ${responseData.opposing_evidence.reasoning}
-            </div>
+            <div class="fact-check-heading">Original Text</div>
+            <div style="white-space: pre-wrap;">${responseData.query}</div>
+          </div>
+
+          ${renderEvidence("Supporting Evidence", responseData.supporting_evidence)}
+          ${renderEvidence("Opposing Evidence", responseData.opposing_evidence)}
+        </div>
+      `;
+
+      // Truncated sources load their full text on demand
+      modal.onclick = async (e) => {
+        const more = e.target.closest(".fact-check-source-more");
+        if (!more) return;
+        e.preventDefault();
+        const response = await fetch(`http://localhost:3001/sources/${more.dataset.sourceId}`);
+        if (response.ok) {
+          more.parentElement.textContent = (await response.json()).content;
+        } else {
+          more.remove();
+        }
+      };
+
+      // Click outside to close
+      overlay.onclick = (e) => {
+        if (e.target === overlay) overlay.remove();
+      };
+    },
+    args: [data],
+  });
+}
+
+// Renders the claims extracted from a multi-sentence selection, each with
+// its verdicts once it has been checked; unfinished claims show a spinner.
+async function showClaimResults(tab, state) {
+  await chrome.scripting.executeScript({
+    target: { tabId: tab.id },
+    func: (state) => {
+      const overlay = document.getElementById("fact-check-overlay");
+      if (!overlay) return;
+      const modal = overlay.querySelector(".fact-check-modal");
+
+      const renderVerdict = (title, evidence) => evidence ? `
+        <div style="margin-top: 8px;">
+          <strong>${title}:</strong> ${evidence.is_factual ? "Factual" : "Not Factual"}
+          (${(evidence.confidence * 100).toFixed(1)}%) &mdash; ${evidence.reasoning}
+        </div>
+      ` : "";
+
+      const renderSource = (source) => `
+        <div class="fact-check-source">
+          <a href="${source.url}" target="_blank" class="fact-check-source-link">
+            ${source.url}
+          </a>
+          <p>${source.content}${source.truncated && source.id
+            ? ` <a href="#" class="fact-check-source-more" data-source-id="${source.id}">more</a>` : ""}</p>
+        </div>
+      `;
+
+      const renderClaim = (claim, response) => {
+        if (!response) {
+          return `
             <div class="fact-check-section">
-              <div class="fact-check-heading">Sources</div>
-              <div class="fact-check-sources">
-                ${responseData.opposing_evidence.sources.map(source => `
-                  <div class="fact-check-source">
-                    <a href="${source.url}" target="_blank" class="fact-check-source-link">
-                      ${source.url}
-                    </a>
-                    <p>${source.content}</p>
-                  </div>
-                `).join("")}
+              <div class="fact-check-heading">${claim}</div>
+              <div class="fact-check-loading">
+                <div class="fact-check-spinner"></div>
               </div>
             </div>
+          `;
+        }
+        const sources = [
+          ...(response.supporting_evidence?.sources || []),
+          ...(response.opposing_evidence?.sources || []),
+        ];
+        return `
+          <div class="fact-check-section">
+            <div class="fact-check-heading">${claim}</div>
+            <div>
+              <strong>Assessment:</strong> ${response.overall_assessment.recommendation.replaceAll("_", " ")}
+              ${response.partial ? " (incomplete)" : ""}
+            </div>
+            ${renderVerdict("Supporting", response.supporting_evidence)}
+            ${renderVerdict("Opposing", response.opposing_evidence)}
+            ${sources.length ? `<div class="fact-check-sources">${sources.map(renderSource).join("")}</div>` : ""}
+          </div>
+        `;
+      };
+
+      modal.innerHTML = `
+        <div style="position: relative;">
+          <div class="fact-check-close" onclick="document.getElementById('fact-check-overlay').remove()">&times;</div>
+
+          <div class="fact-check-section">
+            <div class="fact-check-heading">Original Text</div>
+            <div style="white-space: pre-wrap;">${state.text}</div>
           </div>
+
+          ${state.claims.map((claim, index) => renderClaim(claim, state.responses[index])).join("")}
         </div>
       `;
 
+      // Truncated sources load their full text on demand
+      modal.onclick = async (e) => {
+        const more = e.target.closest(".fact-check-source-more");
+        if (!more) return;
+        e.preventDefault();
+        const response = await fetch(`http://localhost:3001/sources/${more.dataset.sourceId}`);
+        if (response.ok) {
+          more.parentElement.textContent = (await response.json()).content;
+        } else {
+          more.remove();
+        }
+      };
+
       // Click outside to close
       overlay.onclick = (e) => {
         if (e.target === overlay) overlay.remove();
       };
     },
-    args: [data],
+    args: [state],
+  });
+}
+
+// POSTs to a streaming endpoint and hands each NDJSON event to onEvent
+async function streamEvents(path, body, onEvent) {
+  const response = await fetch(`http://localhost:3001${path}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
   });
+
+  if (!response.ok) {
+    const error = new Error(`HTTP error! status: ${response.status}`);
+    error.status = response.status;
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    for (const line of lines) {
+      if (line.trim()) await onEvent(JSON.parse(line));
+    }
+  }
+  if (buffered.trim()) await onEvent(JSON.parse(buffered));
+}
+
+// Calls the streaming fact-check endpoint for a single claim
+async function streamFactCheck(query, onEvent) {
+  await streamEvents("/invoke/stream", { query }, onEvent);
+}
+
+// Has the server extract the check-worthy claims of a longer selection and
+// fact-check each one, rendering claims as they finish. Returns false when
+// the selection has no check-worthy claim.
+async function checkClaims(tab, text) {
+  const state = { text, claims: [], responses: {} };
+  try {
+    await streamEvents("/invoke/batch", { text, stream: true }, async (event) => {
+      if (event.event === "start") {
+        state.claims = event.claims;
+      } else if (event.event === "result") {
+        for (const index of event.indices) state.responses[index] = event.response;
+      } else if (event.event === "error") {
+        throw new Error(event.error);
+      } else {
+        return;
+      }
+      await showClaimResults(tab, state);
+    });
+  } catch (error) {
+    if (error.status === 400) return false;
+    throw error;
+  }
+  return true;
+}
+
+function countSentences(text) {
+  return text.split(/(?<=[.!?])\s+/).filter((sentence) => sentence.trim()).length;
 }
 
 // Add new CSS for the transcription panel
@@ -271,6 +447,7 @@ async function showTranscriptionPanel(tab) {
       // Remove existing panel if it exists
       const existingPanel = document.querySelector(".transcription-panel");
       if (existingPanel) {
+        window.__transcriptionSource?.close();
         existingPanel.remove();
         return;
       }
@@ -281,36 +458,36 @@ async function showTranscriptionPanel(tab) {
       panel.innerHTML = `
         <div class="transcription-panel-header">
           <span>Live Transcription</span>
-          <span class="transcription-close" onclick="this.closest('.transcription-panel').remove()">&times;</span>
+          <span class="transcription-close">&times;</span>
         </div>
-        <div class="transcription-content"></div>
+        <div class="transcription-content">No transcription available</div>
       `;
       document.body.appendChild(panel);
 
-      // Start polling for transcription
-      const updateTranscription = async () => {
-        try {
-          const response = await fetch(
-            "http://localhost:3002/api/transcription"
-          );
-          if (!response.ok) throw new Error("Failed to fetch transcription");
-          const data = await response.json();
-          const content = panel.querySelector(".transcription-content");
-          content.textContent =
-            data.transcription || "No transcription available";
-        } catch (error) {
-          console.error("Transcription error:", error);
+      // Segments are pushed by the server as they are transcribed
+      const content = panel.querySelector(".transcription-content");
+      const segments = [];
+      const source = new EventSource(
+        "http://localhost:3002/api/transcription/stream"
+      );
+      source.onmessage = (event) => {
+        const segment = JSON.parse(event.data);
+        segments.push(segment);
+        // Show the last 15 seconds of audio, like the server's default window
+        while (segments.length && segments[0].end < segment.end - 15) {
+          segments.shift();
         }
+        content.textContent = segments.map((s) => s.text).join(" ");
       };
+      source.onerror = (error) => {
+        console.error("Transcription error:", error);
+      };
+      window.__transcriptionSource = source;
 
-      // Initial fetch
-      updateTranscription();
-
-      // Set up polling interval
-      const intervalId = setInterval(updateTranscription, 15000);
-
-      // Store interval ID for cleanup
-      panel.dataset.intervalId = intervalId;
+      panel.querySelector(".transcription-close").onclick = () => {
+        source.close();
+        panel.remove();
+      };
     },
   });
 }
@@ -346,22 +523,30 @@ chrome.commands.onCommand.addListener(async (command) => {
       // Show loading state
       await showLoadingModal(tab, selectedText);
 
-      // Call API
-      const response = await fetch("http://localhost:3001/invoke", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ query: selectedText }),
-      });
+      await injectResultsCSS(tab);
 
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
+      // Several sentences go through claim extraction and are checked claim
+      // by claim; a single sentence, or a selection without a check-worthy
+      // claim, is checked as it is
+      if (countSentences(selectedText) > 1 && await checkClaims(tab, selectedText)) {
+        return;
       }
 
-      const data = await response.json();
-
-      // Show results
-      console.log("Data:", data);
-      await showResults(tab, data);
+      // Call API, rendering each stance as soon as it arrives
+      const data = { query: selectedText };
+      await streamFactCheck(selectedText, async (event) => {
+        if (event.event === "stance") {
+          data[`${event.stance}_evidence`] = event.evidence;
+        } else if (event.event === "complete") {
+          Object.assign(data, event.response);
+        } else if (event.event === "error") {
+          throw new Error(event.error);
+        } else {
+          return;
+        }
+        console.log("Data:", data);
+        await showResults(tab, data);
+      });
     } catch (error) {
       console.error("Error:", error);
       chrome.notifications.create({
@@ -1,3 +1,29 @@
+const API_BASE = "http://localhost:3001";
+
+// Sources arrive de-duplicated with long snippets cut; "more" fetches the full text
+const renderSources = (sources) => sources.map(source => `
+  <div class="fact-check-source">
+    <a href="${source.url}" target="_blank" class="fact-check-source-link">
+      ${source.url}
+    </a>
+    <p>${source.content}${source.truncated && source.id
+      ? ` <a href="#" class="fact-check-source-more" data-source-id="${source.id}">more</a>` : ""}</p>
+    ${source.also_at ? `<div class="fact-check-source-also">Also at ${source.also_at.length} other site${source.also_at.length > 1 ? "s" : ""}</div>` : ""}
+  </div>
+`).join("");
+
+document.addEventListener("click", async (e) => {
+  const more = e.target.closest(".fact-check-source-more");
+  if (!more) return;
+  e.preventDefault();
+  const response = await fetch(`${API_BASE}/sources/${more.dataset.sourceId}`);
+  if (response.ok) {
+    more.parentElement.textContent = (await response.json()).content;
+  } else {
+    more.remove();
+  }
+});
+
 // Receive data from the background script
 chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
   console.log(message)
@@ -18,14 +44,7 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
       <div class="fact-check-section">
         <div class="fact-check-heading">Sources</div>
         <div class="fact-check-sources">
-          ${data.supporting_evidence.sources.map(source => `
-            <div class="fact-check-source">
-              <a href="${source.url}" target="_blank" class="fact-check-source-link">
-                ${source.url}
-              </a>
-              <p>${source.content}</p>
-            </div>
-          `).join("")}
+          ${renderSources(data.supporting_evidence.sources)}
         </div>
       </div>
     `;
@@ -41,14 +60,7 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
       <div class="fact-check-section">
         <div class="fact-check-heading">Sources</div>
         <div class="fact-check-sources">
-          ${data.opposing_evidence.sources.map(source => `
-            <div class="fact-check-source">
-              <a href="${source.url}" target="_blank" class="fact-check-source-link">
-                ${source.url}
-              </a>
-              <p>${source.content}</p>
-            </div>
-          `).join("")}
+          ${renderSources(data.opposing_evidence.sources)}
         </div>
       </div>
     `;
@@ -1,22 +1,21 @@
 import os
-import sounddevice as sd
+import json
 import numpy as np
-from groq import Groq
-import wave
-from collections import deque
 from datetime import datetime
 import threading
-import queue
-from scipy import signal
-from agent import analyze_factuality
+from processing.ring_buffer import AudioRingBuffer
+from processing.preprocess import AudioPreprocessor
+from processing.vad import SpeechSegmenter
+from processing.ordered_pool import OrderedWorkerPool
+from services.transcription import SAMPLE_RATE, get_backend, preload
+from services.transcript_store import TranscriptStore
+from services.claims import ClaimExtractor, split_sentences
+from services import metrics
 import requests
 import time
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 
-# Initialize the Groq client
-client = Groq()
-
 app = Flask(__name__)
 CORS(app)
 
@@ -25,57 +24,123 @@ CHANNELS = 2
 RATE = 48000  # Higher quality recording
 CHUNK = 1024
 SEGMENT_DURATION = 3
-MAX_TRANSCRIPT_SECONDS = 15
-transcript_buffer = deque(maxlen=MAX_TRANSCRIPT_SECONDS)
-audio_queue = queue.Queue()
+MAX_TRANSCRIPT_SECONDS = 15  # default window of GET /api/transcription, in seconds of audio
+SEGMENT_OVERLAP = float(os.environ.get("SEGMENT_OVERLAP", "0"))  # seconds of previous segment repeated
+RING_BUFFER_SECONDS = 30
+# "vad" cuts segments on speech boundaries, "fixed" every SEGMENT_DURATION seconds
+SEGMENT_MODE = os.environ.get("SEGMENT_MODE", "vad")
+VAD_BLOCK_SECONDS = 0.5
+MAX_UTTERANCE_SECONDS = 12
+# Segments are transcribed concurrently and appended in capture order
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", "3"))
+TRANSCRIBE_QUEUE_SIZE = int(os.environ.get("TRANSCRIBE_QUEUE_SIZE", "16"))
+TRANSCRIBE_QUEUE_POLICY = os.environ.get("TRANSCRIBE_QUEUE_POLICY", "drop_oldest")
+# "groq" (remote) or "local" (offline Whisper, batched)
+TRANSCRIPTION_BACKEND = os.environ.get("TRANSCRIPTION_BACKEND", "groq")
+TRANSCRIBE_BATCH_SIZE = int(os.environ.get("TRANSCRIBE_BATCH_SIZE", "1"))
+# "background" loads the backend while capture starts, "blocking" waits for it
+# first, "off" leaves it to the first segment
+TRANSCRIBE_PRELOAD = os.environ.get("TRANSCRIBE_PRELOAD", "background")
+transcription_pool = None
+audio_ring = AudioRingBuffer(int(RATE * RING_BUFFER_SECONDS), CHANNELS, rate=RATE)
+# Comma-separated preprocessing stages to skip. The transcription backends
+# take 16 kHz mono, so downmix and resample must stay on.
+PREPROCESS_DISABLED = [stage for stage in os.environ.get("PREPROCESS_DISABLED", "").split(",") if stage]
+if {"downmix", "resample"} & set(PREPROCESS_DISABLED):
+    raise ValueError(
+        f"PREPROCESS_DISABLED={','.join(PREPROCESS_DISABLED)}: downmix and resample can't be disabled, "
+        f"the transcription backends expect {SAMPLE_RATE} Hz mono audio"
+    )
+preprocessor = AudioPreprocessor(RATE, CHANNELS, output_rate=SAMPLE_RATE, disabled=PREPROCESS_DISABLED)
+segmenter = SpeechSegmenter(RATE, max_utterance_s=MAX_UTTERANCE_SECONDS)
+
+# Timestamped transcript segments per capture session; the local capture
+# publishes under CAPTURE_SESSION, other captures can POST their own
+CAPTURE_SESSION = os.environ.get("CAPTURE_SESSION", "local")
+transcript_store = TranscriptStore(
+    retention_seconds=float(os.environ.get("TRANSCRIPT_RETENTION_SECONDS", "600")),
+    max_segments=int(os.environ.get("TRANSCRIPT_MAX_SEGMENTS", "1000")),
+    idle_seconds=float(os.environ.get("TRANSCRIPT_SESSION_IDLE_SECONDS", "1800"))
+)
 
 # API configuration
-API_ENDPOINT = "http://localhost:3001/invoke"  # Update with your actual API endpoint
-SEND_INTERVAL = 15  # seconds
-
-def apply_dynamic_processing(audio_data, threshold=-50, ratio=2):
-    db = 20 * np.log10(np.abs(audio_data) + 1e-10)
-    mask = db > threshold
-    gain_reduction = np.zeros_like(db)
-    gain_reduction[mask] = -(db[mask] - threshold) * (1 - 1/ratio)
-    return audio_data * np.power(10, gain_reduction/20)
-
-def apply_noise_reduction(audio_data, noise_reduction_strength=0.1):
-    freq_mask = np.abs(np.fft.rfft(audio_data, axis=0))
-    noise_threshold = np.mean(freq_mask) * noise_reduction_strength
-    mask = freq_mask > noise_threshold
-    freq_data = np.fft.rfft(audio_data, axis=0)
-    freq_data *= mask
-    return np.fft.irfft(freq_data, n=len(audio_data), axis=0)
+API_ENDPOINT = "http://localhost:3001/invoke/batch"  # Update with your actual API endpoint
+DISPATCH_IDLE_SECONDS = 3  # flush an unfinished sentence after this long without new text
+CLAIM_THRESHOLD = float(os.environ.get("CLAIM_THRESHOLD", "0.5"))
+
+def send_claims(session: str, extractor: ClaimExtractor, sentences):
+    """
+    Sends the check-worthy sentences `extractor` hasn't seen yet in one batch request
+    """
+    with metrics.span("extract_claims"):
+        claims = extractor.extract(" ".join(sentences))
+    if not claims:
+        return
+    metrics.count("claims_sent_total", len(claims))
+
+    try:
+        payload = {
+            "claims": claims
+        }
+        with metrics.span("send_claims"):
+            response = requests.post(API_ENDPOINT, json=payload)
+        if response.status_code == 200:
+            print(f"\n=== Sent to API successfully ({session}) ===")
+            print(response.json())
+            print("================================\n")
+        else:
+            print(f"\nError sending to API: {response.status_code}")
+    except Exception as e:
+        print(f"Error sending to API: {e}")
 
 def send_transcript_to_api():
-    last_send_time = time.time()
-    
+    """
+    Sends each newly completed, check-worthy claim for fact checking exactly once.
+
+    Follows every session in the transcript store, the local capture and
+    POSTed ones alike, waking when any of them gets a new segment rather
+    than on a timer. A session's unfinished trailing sentence is held until
+    it completes or the session gets no new text for DISPATCH_IDLE_SECONDS.
+    Each session has its own claim extractor, which drops sentences that
+    aren't check-worthy or were already sent for that session. Requests go
+    out one at a time from this thread.
+    """
+    last_seq = transcript_store.last_seq
+    # session -> {"partial": unfinished sentence, "updated": monotonic time, "extractor": ClaimExtractor}
+    sessions = {}
+
     while True:
-        current_time = time.time()
-        if current_time - last_send_time >= SEND_INTERVAL:
-            try:
-                transcript_text = " ".join(transcript_buffer)
-                if transcript_text.strip():
-                    payload = {
-                        "query": transcript_text
-                    }
-                    response = requests.post(API_ENDPOINT, json=payload)
-                    if response.status_code == 200:
-                        print("\n=== Sent to API successfully ===")
-                        print(response.json())
-                        print("================================\n")
-                    else:
-                        print(f"\nError sending to API: {response.status_code}")
-                
-                last_send_time = current_time
-            
-            except Exception as e:
-                print(f"Error sending to API: {e}")
-        
-        time.sleep(1)  # Sleep to prevent excessive CPU usage
+        last_seq, events = transcript_store.wait_all_since(last_seq, timeout=DISPATCH_IDLE_SECONDS)
+        new_text = {}
+        for event in events:
+            new_text.setdefault(event["session"], []).append(event["text"])
+
+        now = time.monotonic()
+        for session, texts in new_text.items():
+            state = sessions.get(session)
+            if state is None:
+                state = sessions[session] = {"partial": "", "extractor": ClaimExtractor(threshold=CLAIM_THRESHOLD)}
+            state["updated"] = now
+            text = " ".join([state["partial"]] + texts).strip()
+            sentences = split_sentences(text)
+            # The last piece is still being spoken unless it ends a sentence
+            state["partial"] = "" if text[-1:] in ".!?" or not sentences else sentences.pop()
+            if sentences:
+                send_claims(session, state["extractor"], sentences)
+
+        for session, state in list(sessions.items()):
+            idle = now - state["updated"]
+            if state["partial"] and idle >= DISPATCH_IDLE_SECONDS:
+                partial, state["partial"] = state["partial"], ""
+                send_claims(session, state["extractor"], [partial])
+            elif not state["partial"] and idle >= transcript_store.idle_seconds:
+                # The store has dropped the session too
+                del sessions[session]
 
 def record_audio():
+    # Only the local capture needs PortAudio; the API and benchmarks run without it
+    import sounddevice as sd
+
     # Find BlackHole device
     devices = sd.query_devices()
     device_id = None
@@ -88,103 +153,136 @@ def record_audio():
         print("BlackHole device not found!")
         return
 
+    # One long-lived stream feeds the ring buffer from its callback, so there
+    # are no gaps between segments and no per-segment stream setup
+    with sd.InputStream(
+        device=device_id,
+        samplerate=RATE,
+        channels=CHANNELS,
+        dtype=np.float32,
+        blocksize=CHUNK,
+        latency='high',
+        callback=audio_ring.callback
+    ):
+        capture_segments()
+
+def capture_segments():
+    """
+    Cuts the audio arriving in the ring buffer into segments and queues them
+    for transcription until the buffer is closed
+    """
+    segment_frames = int(RATE * SEGMENT_DURATION)
+    overlap_frames = int(RATE * SEGMENT_OVERLAP)
+    vad_block_frames = int(RATE * VAD_BLOCK_SECONDS)
+
     while True:
         try:
-            frames = []
-            with sd.InputStream(
-                device=device_id,
-                samplerate=RATE,
-                channels=CHANNELS,
-                dtype=np.float32,
-                blocksize=CHUNK,
-                latency='high'
-            ) as stream:
-                # Record for one second
-                for _ in range(0, int(RATE / CHUNK * SEGMENT_DURATION)):
-                    data, overflowed = stream.read(CHUNK)
-                    if overflowed:
-                        print("Audio buffer has overflowed")
-                    if np.abs(data).mean() > 0.0001:
-                        frames.append(data)
-
-            if frames:
-                # Process audio
-                audio_data = np.concatenate(frames, axis=0)
-                audio_data = audio_data - np.mean(audio_data, axis=0)
-                audio_data = apply_noise_reduction(audio_data)
-                audio_data = apply_dynamic_processing(audio_data)
-
-                # Apply low-pass filter
-                nyquist = RATE / 2
-                cutoff = 18000
-                b, a = signal.butter(4, cutoff/nyquist, btype='low')
-                audio_data = signal.filtfilt(b, a, audio_data, axis=0)
-
-                # Normalize
-                peak = np.max(np.abs(audio_data))
-                if peak > 0:
-                    audio_data = audio_data / peak * 0.9
-
-                # Noise gate
-                noise_floor = 0.001
-                audio_data[np.abs(audio_data) < noise_floor] = 0
-
-                # Convert to 16-bit PCM
-                audio_data_int16 = (audio_data * 32767).astype(np.int16)
-
-                # Save temporary file
-                filename = f"segment_{datetime.now().timestamp()}.wav"
-                with wave.open(filename, 'wb') as wf:
-                    wf.setnchannels(CHANNELS)
-                    wf.setsampwidth(2)
-                    wf.setframerate(RATE)
-                    wf.writeframes(audio_data_int16.tobytes())
-
-                # Put filename in queue for processing
-                audio_queue.put(filename)
+            if SEGMENT_MODE == "vad":
+                # Cut utterances on speech boundaries; non-speech never leaves the segmenter
+                block = audio_ring.read_segment(vad_block_frames)
+                if block is None:
+                    break
+                for position, utterance in segmenter.feed(block.mean(axis=1), audio_ring.segment_start):
+                    enqueue_segment(utterance, position)
+            else:
+                audio_data = audio_ring.read_segment(segment_frames, overlap=overlap_frames)
+                if audio_data is None:
+                    break
+
+                # Skip silent segments
+                if np.abs(audio_data).mean() <= 0.0001:
+                    continue
+                enqueue_segment(audio_data, audio_ring.segment_start)
 
         except KeyboardInterrupt:
+            audio_ring.close()
             break
 
-def process_audio():
-    while True:
+    for position, utterance in segmenter.flush():
+        enqueue_segment(utterance, position)
+
+def enqueue_segment(audio_data, position: int):
+    """
+    Preprocesses a captured segment starting at ring buffer frame `position` and queues it for transcription
+    """
+    # Capture times come from the stream position, not from when the segment
+    # was read: a backlog in the ring buffer must not reorder or shift them
+    start = audio_ring.frame_time(position)
+    end = start + len(audio_data) / RATE
+
+    # Downmix/resample to 16 kHz mono, denoise, compress, normalize
+    with metrics.span("preprocess"):
+        audio_data = preprocessor.process(audio_data)
+    metrics.count("segments_total", mode=SEGMENT_MODE)
+
+    # Hand the in-memory segment to the transcription workers
+    transcription_pool.submit((audio_data, start, end))
+
+def process_audio(item):
+    """
+    Transcribes one preprocessed (audio, start, end) segment; runs on the transcription worker pool
+    """
+    segment, start, end = item
+    with metrics.span("transcribe", backend=TRANSCRIPTION_BACKEND):
+        return get_backend(TRANSCRIPTION_BACKEND).transcribe(segment), start, end
+
+def process_audio_batch(items):
+    """
+    Transcribes several queued segments in one backend call
+    """
+    with metrics.span("transcribe_batch", backend=TRANSCRIPTION_BACKEND):
+        texts = get_backend(TRANSCRIPTION_BACKEND).transcribe_batch([segment for segment, _, _ in items])
+    return [(text, start, end) for text, (_, start, end) in zip(texts, items)]
+
+def append_transcript(result):
+    """
+    Receives (text, start, end) transcriptions from the worker pool in capture order
+    """
+    text, start, end = result
+    # Capture end to transcript, including any ring buffer backlog and queueing and reordering in the pool
+    metrics.observe("transcript_latency_seconds", time.time() - end)
+    if text.strip():
         try:
-            filename = audio_queue.get()
-            
-            with open(filename, "rb") as file:
-                transcription = client.audio.transcriptions.create(
-                    file=(filename, file.read()),
-                    model="whisper-large-v3-turbo",
-                    response_format="json",
-                    language="en",
-                    temperature=0.0
-                )
-            
-            if transcription.text.strip():
-                transcript_buffer.append(transcription.text)
-            
-            os.remove(filename)
-            
-            print("\n=== Last 15 seconds of transcript ===")
-            print(" ".join(transcript_buffer))
-            print("=====================================\n")
-
-        except Exception as e:
-            print(f"Error processing audio: {e}")
-        finally:
-            audio_queue.task_done()
+            transcript_store.publish(CAPTURE_SESSION, text.strip(), start, end)
+        except ValueError:
+            # Counted in transcript_store.stats(); capture times are ordered, so this shouldn't happen
+            return
+
+    print(f"\n=== Last {MAX_TRANSCRIPT_SECONDS} seconds of transcript ===")
+    print(" ".join(segment["text"] for segment in transcript_store.window(CAPTURE_SESSION, MAX_TRANSCRIPT_SECONDS)))
+    print("=====================================\n")
 
 @app.route('/api/transcription', methods=['GET'])
 def get_transcription():
+    """
+    Transcript of `?session=` (default: the local capture). `?since=<seq>`
+    returns only segments newer than the given sequence number; otherwise
+    `?start=`/`?end=` (Unix seconds) or `?window=<seconds>` select a time
+    range, defaulting to the last MAX_TRANSCRIPT_SECONDS seconds.
+    """
     try:
-        # Join the entries in the transcript buffer to form the last 15 seconds of transcription
-        transcript_text = " ".join(transcript_buffer)
-        
+        session = request.args.get('session', CAPTURE_SESSION)
+        since = request.args.get('since', type=int)
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        window = request.args.get('window', type=float)
+
+        if since is not None:
+            segments = transcript_store.since(session, since)
+        elif start is not None or end is not None:
+            segments = transcript_store.window(session, start=start, end=end)
+        else:
+            window = window or MAX_TRANSCRIPT_SECONDS
+            segments = transcript_store.window(session, window)
+
         return jsonify({
             "success": True,
-            "transcription": transcript_text,
+            "session": session,
+            "transcription": " ".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "last_seq": segments[-1]["seq"] if segments else since,
             "timestamp": datetime.now().isoformat(),
-            "duration_seconds": MAX_TRANSCRIPT_SECONDS
+            "duration_seconds": window
         }), 200
         
     except Exception as e:
@@ -193,15 +291,110 @@ def get_transcription():
             "error": str(e)
         }), 500
 
+@app.route('/api/transcription', methods=['POST'])
+def add_transcription():
+    """
+    Lets other capture clients publish segments: {"session", "text", "start"?, "end"?}.
+    Times are Unix seconds; a segment may not start before the session's previous one.
+    """
+    data = request.json or {}
+    session = data.get('session')
+    text = (data.get('text') or '').strip()
+    if not session or not text:
+        return jsonify({"success": False, "error": "session and text are required"}), 400
+
+    try:
+        segment = transcript_store.publish(session, text, data.get('start'), data.get('end'))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "segment": segment}), 201
+
+@app.route('/api/transcription/stream', methods=['GET'])
+def stream_transcription():
+    """
+    Server-Sent Events stream of a session's transcript segments as they are
+    transcribed. Resumes after `?since=<seq>` or the Last-Event-ID header; by
+    default starts with the segments of the last MAX_TRANSCRIPT_SECONDS seconds.
+    """
+    session = request.args.get('session', CAPTURE_SESSION)
+    since = request.args.get('since', type=int)
+    if since is None and 'Last-Event-ID' in request.headers:
+        since = int(request.headers['Last-Event-ID'])
+    if since is None:
+        recent = transcript_store.window(session, MAX_TRANSCRIPT_SECONDS)
+        since = recent[0]["seq"] - 1 if recent else transcript_store.last_seq
+
+    def generate():
+        seq = since
+        while True:
+            events = transcript_store.wait_since(session, seq, timeout=15)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield f"id: {event['seq']}\ndata: {json.dumps(event)}\n\n"
+            seq = events[-1]["seq"]
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/audio/stats', methods=['GET'])
+def get_audio_stats():
+    return jsonify({
+        "success": True,
+        "ring_buffer": audio_ring.stats(),
+        "vad": segmenter.stats(),
+        "transcription": transcription_pool.stats() if transcription_pool else None,
+        "transcripts": transcript_store.stats()
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+metrics.gauge("audio_ring_dropped_frames", lambda: audio_ring.stats()["dropped_frames"],
+              help="Frames lost to ring buffer overflow")
+metrics.gauge("transcribe_queue_depth", lambda: transcription_pool.stats()["queue_depth"] if transcription_pool else None,
+              help="Segments waiting for a transcription worker")
+metrics.gauge("transcript_rejected_segments", lambda: transcript_store.rejected_segments,
+              help="Segments the transcript store refused (bad or out-of-order times)")
+
+def start_transcription():
+    """
+    Starts the worker pool that feeds the transcript store. The backend and
+    the preprocessing filters load in the background (see TRANSCRIBE_PRELOAD);
+    segments captured meanwhile wait in the pool.
+    """
+    global transcription_pool
+    if TRANSCRIBE_PRELOAD == "blocking":
+        get_backend(TRANSCRIPTION_BACKEND, warm_up=True)
+        preprocessor.warm_up()
+    elif TRANSCRIBE_PRELOAD != "off":
+        preload(TRANSCRIPTION_BACKEND)
+        threading.Thread(target=preprocessor.warm_up, name="preprocess-warm-up", daemon=True).start()
+    transcription_pool = OrderedWorkerPool(
+        process_audio_batch if TRANSCRIBE_BATCH_SIZE > 1 else process_audio,
+        append_transcript,
+        workers=TRANSCRIBE_WORKERS,
+        max_queue=TRANSCRIBE_QUEUE_SIZE,
+        policy=TRANSCRIBE_QUEUE_POLICY,
+        name="transcribe",
+        batch_size=TRANSCRIBE_BATCH_SIZE
+    )
+    return transcription_pool
+
 def main():
     print("Starting live transcription (Press Ctrl+C to stop)...")
     
+    start_transcription()
+
     record_thread = threading.Thread(target=record_audio, daemon=True)
-    process_thread = threading.Thread(target=process_audio, daemon=True)
     api_thread = threading.Thread(target=send_transcript_to_api, daemon=True)
     
     record_thread.start()
-    process_thread.start()
     api_thread.start()
     app.run(host='0.0.0.0', port=3002)
     
@@ -1,21 +1,90 @@
-from datetime import datetime
+import itertools
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, fields, replace
 from typing import Any, Dict
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Ids are a per-process random prefix plus a counter: unique across processes,
+# ordered within one, and far cheaper than a uuid4 per message
+_ID_PREFIX = f"{os.getpid():x}{uuid.uuid4().hex[:8]}"
+_id_counter = itertools.count(1)
+
+def new_message_id() -> str:
+    return f"{_ID_PREFIX}-{next(_id_counter)}"
+
+@dataclass(frozen=True, slots=True)
 class Message:
-    def __init__(self, sender, receiver, message_type, content, metadata=None):
-        self.sender = sender
-        self.receiver = receiver
-        self.message_type = message_type
-        self.content = content
-        self.metadata = metadata or {}
-        self.timestamp = datetime.now().isoformat()
-
-    def to_dict(self):
-        return {
-            "sender": self.sender,
-            "receiver": self.receiver,
-            "message_type": self.message_type,
-            "content": self.content,
-            "metadata": self.metadata,
-            "timestamp": self.timestamp
-        }
+    """
+    Immutable message passed between agents through the broker.
+
+    `timestamp` is Unix time in seconds. Use with_correlation() / replace()
+    to derive a changed copy.
+    """
+    sender: str
+    receiver: str
+    message_type: str
+    content: Any
+    metadata: Dict = None
+    timestamp: float = None
+    message_id: str = None
+    correlation_id: str = None
+
+    def __post_init__(self):
+        # Frozen dataclasses can only fill defaults through object.__setattr__
+        if self.timestamp is None:
+            object.__setattr__(self, "timestamp", time.time())
+        if self.message_id is None:
+            object.__setattr__(self, "message_id", new_message_id())
+
+    def with_correlation(self, correlation_id: str) -> "Message":
+        return replace(self, correlation_id=correlation_id)
+
+    def to_dict(self) -> Dict:
+        # Shallow on purpose: asdict() would deep-copy every payload
+        return {name: getattr(self, name) for name in _FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        return cls(**data)
+
+    def to_json(self) -> bytes:
+        """
+        UTF-8 JSON, through orjson when it is installed
+        """
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(), default=str)
+        return json.dumps(self.to_dict(), default=str, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_json(cls, data) -> "Message":
+        return cls.from_dict(orjson.loads(data) if orjson is not None else json.loads(data))
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary form for moving messages between processes: msgpack when
+        installed, otherwise the JSON encoding
+        """
+        if msgpack is not None:
+            return msgpack.packb(self.to_dict(), default=str)
+        return self.to_json()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Message":
+        # JSON always starts with "{"; a msgpack map never does
+        if msgpack is not None and data[:1] != b"{":
+            return cls.from_dict(msgpack.unpackb(data))
+        return cls.from_json(data)
+
+_FIELDS = tuple(field.name for field in fields(Message))
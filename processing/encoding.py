@@ -0,0 +1,21 @@
+import io
+import wave
+import numpy as np
+
+def encode_wav(audio_int16: np.ndarray, channels: int, rate: int) -> bytes:
+    """
+    Encodes 16-bit PCM samples as an in-memory WAV file
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(np.ascontiguousarray(audio_int16, dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+def to_int16(audio_data: np.ndarray) -> np.ndarray:
+    """
+    Converts float samples in [-1, 1] to 16-bit PCM
+    """
+    return (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16)
@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class OrderedWorkerPool:
+    """
+    Runs `worker` over submitted items on several threads and hands results to
+    `on_result` strictly in submission order.
+
+    The input queue is bounded. When it is full, the "drop_oldest" policy
+    discards the oldest queued item to make room (keeping the pool close to
+    real time), while "block" makes submit() wait. Dropped items and items
+    whose worker raised are skipped in the output order rather than stalling it.
+    Both worker failures ("errors") and on_result failures ("delivery_errors")
+    are logged and counted in stats().
+
+    With batch_size > 1, each worker call takes up to that many queued items as
+    a list and must return a list of results of the same length.
+    """
+    def __init__(self, worker, on_result, workers: int = 3, max_queue: int = 16,
+                 policy: str = "drop_oldest", name: str = "worker", batch_size: int = 1):
+        if policy not in ("drop_oldest", "block"):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.worker = worker
+        self.on_result = on_result
+        self.max_queue = max_queue
+        self.policy = policy
+        self.batch_size = batch_size
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._next_seq = 0
+        self._next_emit = 0
+        self._finished = {}  # seq -> (ok, result) awaiting earlier items
+        self._emit_lock = threading.Lock()
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.delivery_errors = 0
+        self._latencies = deque(maxlen=256)  # (queue_wait, processing) seconds
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, item) -> int:
+        """
+        Queues an item and returns its sequence number
+        """
+        dropped = False
+        with self._cond:
+            if self.policy == "block":
+                self._cond.wait_for(lambda: len(self._queue) < self.max_queue or self._closed)
+            elif len(self._queue) >= self.max_queue:
+                dropped_seq, _, _ = self._queue.popleft()
+                self.dropped += 1
+                self._finished[dropped_seq] = (False, None)
+                dropped = True
+            seq = self._next_seq
+            self._next_seq += 1
+            self._queue.append((seq, item, time.monotonic()))
+            self.submitted += 1
+            self._cond.notify_all()
+        if dropped:
+            self._emit()
+        return seq
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._cond.notify_all()
+
+            started = time.monotonic()
+            try:
+                if self.batch_size > 1:
+                    results = self.worker([item for _, item, _ in batch])
+                    if len(results) != len(batch):
+                        raise ValueError(f"worker returned {len(results)} results for {len(batch)} items")
+                else:
+                    results = [self.worker(batch[0][1])]
+                ok = True
+            except Exception as e:
+                logger.error(f"Error in {threading.current_thread().name}: {e}")
+                results, ok = [None] * len(batch), False
+            finished = time.monotonic()
+
+            with self._cond:
+                for (seq, _, queued_at), result in zip(batch, results):
+                    self._latencies.append((started - queued_at, finished - started))
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.errors += 1
+                    self._finished[seq] = (ok, result)
+            self._emit()
+
+    def _emit(self):
+        # One thread at a time delivers, so on_result sees results in order
+        with self._emit_lock:
+            while True:
+                with self._cond:
+                    entry = self._finished.pop(self._next_emit, None)
+                    if entry is None:
+                        return
+                    self._next_emit += 1
+                ok, result = entry
+                if ok:
+                    try:
+                        self.on_result(result)
+                    except Exception as e:
+                        logger.error(f"Error delivering result: {e}")
+                        with self._cond:
+                            self.delivery_errors += 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(wait for wait, _ in self._latencies)
+            durations = sorted(duration for _, duration in self._latencies)
+            return {
+                "workers": len(self._threads),
+                "queue_depth": len(self._queue),
+                "max_queue": self.max_queue,
+                "policy": self.policy,
+                "batch_size": self.batch_size,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "delivery_errors": self.delivery_errors,
+                "awaiting_order": len(self._finished),
+                "queue_wait_p50": percentile(waits, 0.5),
+                "queue_wait_p95": percentile(waits, 0.95),
+                "latency_p50": percentile(durations, 0.5),
+                "latency_p95": percentile(durations, 0.95)
+            }
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
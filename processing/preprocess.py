@@ -0,0 +1,126 @@
+import time
+from math import gcd
+import numpy as np
+
+def _signal():
+    # scipy.signal takes about a second to import; only pay for it once a
+    # segment actually needs resampling or filtering
+    from scipy import signal
+    return signal
+
+STAGES = ("downmix", "resample", "dc_offset", "noise_reduction", "dynamics", "lowpass", "normalize", "noise_gate")
+
+class AudioPreprocessor:
+    """
+    Reusable preprocessing chain for captured audio segments.
+
+    Audio is downmixed and resampled to the transcriber's rate first, so every
+    later stage works on a sixth of the samples when going from 48 kHz stereo
+    to 16 kHz mono. Filter coefficients are designed once per instance,
+    the noise reduction takes a single FFT, and stages operate in place on
+    float32 buffers. Individual stages can be switched off via `disabled`.
+    """
+    def __init__(self, input_rate: int, channels: int, output_rate: int = 16000,
+                 lowpass_cutoff: float = 18000, noise_reduction_strength: float = 0.1,
+                 compressor_threshold: float = -50, compressor_ratio: float = 2,
+                 noise_floor: float = 0.001, peak: float = 0.9, disabled=()):
+        unknown = set(disabled) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown preprocessing stages: {sorted(unknown)}")
+        self.input_rate = input_rate
+        self.channels = channels
+        self.output_rate = output_rate if "resample" not in disabled else input_rate
+        self.output_channels = 1 if "downmix" not in disabled else channels
+        self.enabled = {stage: stage not in disabled for stage in STAGES}
+        self.noise_reduction_strength = noise_reduction_strength
+        self.noise_floor = noise_floor
+        self.peak = peak
+
+        self._downmix_weights = np.full(channels, 1 / channels, dtype=np.float32)
+
+        # Polyphase resampling ratio, e.g. 48000 -> 16000 is up=1, down=3
+        divisor = gcd(int(self.output_rate), int(input_rate))
+        self._up = int(self.output_rate) // divisor
+        self._down = int(input_rate) // divisor
+
+        # Compressor expressed on linear amplitude: gain = (|x| / t) ** -exponent above t
+        self._threshold_linear = np.float32(10 ** (compressor_threshold / 20))
+        self._compressor_exponent = np.float32(1 - 1 / compressor_ratio)
+
+        # A low-pass above the output Nyquist frequency is a no-op; the
+        # resampler's anti-aliasing filter already covers it
+        nyquist = self.output_rate / 2
+        self._sos = None
+        if lowpass_cutoff < nyquist:
+            self._sos = _signal().butter(4, lowpass_cutoff / nyquist, btype='low', output='sos')
+
+    def process(self, audio_data: np.ndarray, timings: dict = None) -> np.ndarray:
+        """
+        Runs the enabled stages over one segment.
+
+        Args:
+            audio_data: (frames, channels) or (frames,) float samples at input_rate;
+                float32 input may be modified in place
+            timings: optional dict that receives the seconds spent in each stage
+        Returns:
+            float32 samples at output_rate; 1-D when downmixed
+        """
+        audio = np.asarray(audio_data, dtype=np.float32)
+        for stage in STAGES:
+            if not self.enabled[stage]:
+                continue
+            started = time.perf_counter()
+            audio = getattr(self, f"_{stage}")(audio)
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+        return audio
+
+    def warm_up(self):
+        """
+        Runs the chain over a short silent block so the first real segment
+        doesn't pay for importing scipy and building its filters
+        """
+        self.process(np.zeros((self.input_rate // 10, self.channels), dtype=np.float32))
+
+    def _downmix(self, audio):
+        if audio.ndim == 2:
+            # A matrix-vector product is much faster than mean(axis=1) on interleaved frames
+            return audio @ self._downmix_weights[:audio.shape[1]]
+        return audio
+
+    def _resample(self, audio):
+        if self._up == self._down:
+            return audio
+        return _signal().resample_poly(audio, self._up, self._down, axis=0).astype(np.float32, copy=False)
+
+    def _dc_offset(self, audio):
+        audio -= audio.mean(axis=0, dtype=np.float32)
+        return audio
+
+    def _noise_reduction(self, audio):
+        spectrum = np.fft.rfft(audio, axis=0)
+        magnitude = np.abs(spectrum)
+        spectrum[magnitude <= magnitude.mean() * self.noise_reduction_strength] = 0
+        return np.fft.irfft(spectrum, n=len(audio), axis=0).astype(np.float32, copy=False)
+
+    def _dynamics(self, audio):
+        # Only samples above the threshold are attenuated, so only they pay for the power
+        magnitude = np.abs(audio)
+        loud = magnitude > self._threshold_linear
+        audio[loud] *= np.power(magnitude[loud] / self._threshold_linear, -self._compressor_exponent)
+        return audio
+
+    def _lowpass(self, audio):
+        if self._sos is None:
+            return audio
+        return _signal().sosfiltfilt(self._sos, audio, axis=0).astype(np.float32, copy=False)
+
+    def _normalize(self, audio):
+        peak = np.max(np.abs(audio)) if audio.size else 0
+        if peak > 0:
+            audio *= np.float32(self.peak / peak)
+        return audio
+
+    def _noise_gate(self, audio):
+        audio[np.abs(audio) < self.noise_floor] = 0
+        return audio
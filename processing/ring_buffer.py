@@ -0,0 +1,104 @@
+import threading
+import time
+import numpy as np
+
+class AudioRingBuffer:
+    """
+    Preallocated ring buffer of audio frames fed by an input stream callback.
+
+    The writer (the audio callback) never blocks or allocates; the reader cuts
+    fixed-size segments from it, optionally overlapping the previous segment.
+    Positions are absolute frame counts, so a reader that falls more than
+    `capacity` frames behind loses the oldest audio and the loss is counted.
+    Given the stream's `rate`, frame_time() maps a position to wall-clock time.
+    """
+    def __init__(self, capacity: int, channels: int, dtype=np.float32, rate: int = None):
+        self.capacity = capacity
+        self.channels = channels
+        self.rate = rate
+        # Wall-clock time of frame 0, set by the first write
+        self.started_at = None
+        # Absolute position of the first frame returned by the last read_segment
+        self.segment_start = 0
+        self._buffer = np.zeros((capacity, channels), dtype=dtype)
+        self._write_pos = 0
+        self._read_pos = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stream_overflows = 0
+        self.dropped_frames = 0
+
+    def write(self, block: np.ndarray):
+        total = len(block)
+        # Only the newest `capacity` frames of an oversized block can be held
+        block = block[-self.capacity:]
+        frames = len(block)
+        with self._cond:
+            if self.started_at is None and self.rate:
+                # The block has just arrived, so its first frame was captured `total` frames ago
+                self.started_at = time.time() - total / self.rate
+            start = (self._write_pos + total - frames) % self.capacity
+            first = min(frames, self.capacity - start)
+            self._buffer[start:start + first] = block[:first]
+            if first < frames:
+                self._buffer[:frames - first] = block[first:]
+            self._write_pos += total
+            self._cond.notify_all()
+
+    def callback(self, indata, frames, time, status):
+        """
+        sounddevice InputStream callback
+        """
+        if status and status.input_overflow:
+            self.stream_overflows += 1
+        self.write(indata)
+
+    def read_segment(self, frames: int, overlap: int = 0, timeout: float = None):
+        """
+        Blocks until `frames` new frames are available and returns them as a
+        new array, prefixed with up to `overlap` frames of already-read audio.
+        Returns None on timeout or once the buffer is closed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._closed or self._write_pos - self._read_pos >= frames,
+                timeout=timeout
+            ) or self._closed:
+                return None
+
+            # Reader fell behind: skip ahead to the oldest frames still held
+            oldest = self._write_pos - self.capacity
+            if self._read_pos < oldest:
+                self.dropped_frames += oldest - self._read_pos
+                self._read_pos = oldest
+
+            start = max(self._read_pos - overlap, oldest, 0)
+            end = self._read_pos + frames
+            indices = np.arange(start, end) % self.capacity
+            segment = self._buffer[indices]
+            self._read_pos = end
+            self.segment_start = start
+            return segment
+
+    def frame_time(self, position: int) -> float:
+        """
+        Wall-clock capture time of the frame at absolute `position`
+        """
+        if self.rate is None or self.started_at is None:
+            raise ValueError("frame_time needs a rate and at least one write")
+        return self.started_at + position / self.rate
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "capacity_frames": self.capacity,
+                "frames_written": self._write_pos,
+                "frames_buffered": min(self._write_pos - self._read_pos, self.capacity),
+                "stream_overflows": self.stream_overflows,
+                "dropped_frames": self.dropped_frames
+            }
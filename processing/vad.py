@@ -0,0 +1,198 @@
+from collections import deque
+import numpy as np
+
+class VoiceActivityDetector:
+    """
+    Frame-level voice activity detection from energy and spectral flatness.
+
+    A frame counts as speech when its energy is `margin_db` above an adaptive
+    noise floor (and above `min_energy_db`) and its spectrum is peaky enough:
+    broadband noise has a spectral flatness near 0.5, voiced speech well below.
+    """
+    def __init__(self, rate: int, frame_ms: float = 30, margin_db: float = 10,
+                 min_energy_db: float = -55, max_flatness: float = 0.4, noise_adapt: float = 0.05):
+        self.rate = rate
+        self.frame_length = int(rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.max_flatness = max_flatness
+        self.noise_adapt = noise_adapt
+        self.noise_db = None
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+
+    def features(self, frames: np.ndarray):
+        """
+        Per-frame energy (dB) and spectral flatness for a (n, frame_length) array
+        """
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, flatness
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Returns a boolean speech mask for a (n, frame_length) array of frames,
+        updating the noise floor from the frames judged to be non-speech
+        """
+        energy_db, flatness = self.features(frames)
+        speech = np.zeros(len(frames), dtype=bool)
+        for index, (energy, flat) in enumerate(zip(energy_db, flatness)):
+            if self.noise_db is None:
+                self.noise_db = float(energy)
+            threshold = max(self.noise_db + self.margin_db, self.min_energy_db)
+            speech[index] = energy > threshold and flat < self.max_flatness
+            if not speech[index]:
+                self.noise_db += self.noise_adapt * float(energy - self.noise_db)
+        return speech
+
+    def contains_speech(self, audio: np.ndarray, min_speech_ms: float = 150) -> bool:
+        """
+        True if a mono buffer holds at least `min_speech_ms` of speech frames
+        """
+        count = len(audio) // self.frame_length
+        if count == 0:
+            return False
+        frames = np.asarray(audio[:count * self.frame_length], dtype=np.float32).reshape(count, self.frame_length)
+        speech_frames = int(np.count_nonzero(self.classify(frames)))
+        return speech_frames * self.frame_length * 1000 / self.rate >= min_speech_ms
+
+class SpeechSegmenter:
+    """
+    Cuts a continuous mono stream into utterances on speech boundaries.
+
+    Audio is fed in arbitrary-sized blocks; completed utterances come back from
+    feed() as (start, audio) pairs, where start is the stream position (in
+    samples) of the utterance's first sample. An utterance starts at the first speech frame (with `pre_roll_ms`
+    of lead-in) and ends after `hangover_ms` of non-speech, or is cut at
+    `max_utterance_s`. Blips shorter than `min_speech_ms` of speech are
+    discarded, and utterances shorter than `min_utterance_ms` are held back
+    and merged into the next one if it starts within `merge_gap_ms`.
+    """
+    def __init__(self, rate: int, vad: VoiceActivityDetector = None, hangover_ms: float = 400,
+                 pre_roll_ms: float = 200, min_speech_ms: float = 150, min_utterance_ms: float = 1500,
+                 max_utterance_s: float = 12, merge_gap_ms: float = 1500):
+        self.rate = rate
+        self.vad = vad or VoiceActivityDetector(rate)
+        frame_ms = self.vad.frame_length * 1000 / rate
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.min_utterance_frames = int(min_utterance_ms / frame_ms)
+        self.max_utterance_frames = max(1, int(max_utterance_s * 1000 / frame_ms))
+        self.merge_gap_frames = int(merge_gap_ms / frame_ms)
+
+        self._remainder = np.zeros(0, dtype=np.float32)
+        # Stream position of the next sample to be fed
+        self._position = 0
+        self._current_start = 0
+        self._pending_start = 0
+        self._pre_roll = deque(maxlen=max(1, int(pre_roll_ms / frame_ms)))
+        self._current = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._pending = None
+        self._pending_gap = 0
+
+        self.frames_seen = 0
+        self.speech_frames_seen = 0
+        self.discarded_blips = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._current)
+
+    def feed(self, audio: np.ndarray, position: int = None):
+        """
+        Consumes a block of mono samples and returns the (start, audio)
+        utterances it completed. `position` is the block's stream position
+        when the caller knows it, e.g. after the capture dropped audio;
+        otherwise the block follows the previous one.
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if position is not None:
+            self._position = position
+        base = self._position - len(self._remainder)
+        self._position += len(audio)
+        audio = np.concatenate([self._remainder, audio])
+        frame_length = self.vad.frame_length
+        count = len(audio) // frame_length
+        self._remainder = audio[count * frame_length:]
+        if count == 0:
+            return []
+
+        frames = audio[:count * frame_length].reshape(count, frame_length)
+        speech = self.vad.classify(frames)
+        self.frames_seen += count
+        self.speech_frames_seen += int(np.count_nonzero(speech))
+
+        completed = []
+        for index, (frame, is_speech) in enumerate(zip(frames, speech)):
+            if self._current:
+                self._current.append(frame)
+                if is_speech:
+                    self._speech_frames += 1
+                    self._silence_run = 0
+                else:
+                    self._silence_run += 1
+                if self._silence_run >= self.hangover_frames or len(self._current) >= self.max_utterance_frames:
+                    self._end_utterance(completed)
+            elif is_speech:
+                self._current_start = base + (index - len(self._pre_roll)) * frame_length
+                self._current = list(self._pre_roll) + [frame]
+                self._pre_roll.clear()
+                self._speech_frames = 1
+                self._silence_run = 0
+            else:
+                self._pre_roll.append(frame)
+                if self._pending is not None:
+                    self._pending_gap += 1
+                    if self._pending_gap >= self.merge_gap_frames:
+                        completed.append((self._pending_start, self._pending))
+                        self._pending = None
+        return completed
+
+    def _end_utterance(self, completed):
+        # Keep a little trailing context but drop the rest of the hangover silence
+        keep = len(self._current) - max(0, self._silence_run - self._pre_roll.maxlen)
+        utterance = np.concatenate(self._current[:keep])
+        start = self._current_start
+        speech_frames = self._speech_frames
+        self._current = []
+        self._speech_frames = 0
+        self._silence_run = 0
+
+        if speech_frames < self.min_speech_frames:
+            self.discarded_blips += 1
+            return
+
+        if self._pending is not None:
+            utterance = np.concatenate([self._pending, utterance])
+            start = self._pending_start
+            self._pending = None
+
+        if len(utterance) < self.min_utterance_frames * self.vad.frame_length:
+            self._pending = utterance
+            self._pending_start = start
+            self._pending_gap = 0
+        else:
+            completed.append((start, utterance))
+
+    def flush(self):
+        """
+        Returns the (start, audio) utterances still buffered, e.g. at the end of a capture
+        """
+        completed = []
+        if self._current:
+            self._silence_run = 0
+            self._end_utterance(completed)
+        if self._pending is not None:
+            completed.append((self._pending_start, self._pending))
+            self._pending = None
+        return completed
+
+    def stats(self):
+        return {
+            "frames_seen": self.frames_seen,
+            "speech_ratio": self.speech_frames_seen / self.frames_seen if self.frames_seen else 0.0,
+            "discarded_blips": self.discarded_blips,
+            "noise_floor_db": self.vad.noise_db
+        }
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Words that rarely change the meaning of a claim; dropped from fingerprints
+_STOPWORDS = frozenset("""
+a an the and or but of to in on at by for with from as is are was were be been being
+that this these those it its there their they he she we you i so very just really
+""".split())
+
+def normalize_claim(text: str) -> str:
+    """
+    Folds case, punctuation and whitespace so trivially different phrasings share a key
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def claim_fingerprint(text: str) -> str:
+    """
+    Near-duplicate fingerprint: the content words of the normalized claim, in
+    order. Catches lightly padded repeats ("So the tower is in Paris" / "The
+    tower is in Paris") but keeps word order, so "Dogs chase cats" and "Cats
+    chase dogs" stay apart.
+    """
+    return " ".join(token for token in normalize_claim(text).split() if token not in _STOPWORDS)
+
+def cache_key(text: str, fingerprint: bool = False, namespace: str = "") -> str:
+    normalized = claim_fingerprint(text) if fingerprint else normalize_claim(text)
+    return hashlib.sha1(f"{namespace}:{normalized}".encode("utf-8")).hexdigest()
+
+class MemoryCache:
+    """
+    Thread-safe in-memory LRU cache with a per-entry TTL
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "memory",
+            "size": len(self),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+class SQLiteCache:
+    """
+    On-disk LRU cache with a per-entry TTL, shared by every process pointing at the same file.
+    Values must be JSON-serializable.
+    """
+    def __init__(self, path: str = "cache.sqlite3", max_size: int = 10000, ttl: float = 3600):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now)
+            )
+            overflow = len(self) - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": len(self),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+def create_cache(backend: str = "memory", **kwargs):
+    """
+    Builds a cache backend by name: "memory", "sqlite" or "off" (returns None)
+    """
+    backend = (backend or "off").lower()
+    if backend == "memory":
+        kwargs.pop("path", None)
+        return MemoryCache(**kwargs)
+    if backend == "sqlite":
+        return SQLiteCache(**kwargs)
+    if backend in ("off", "none", ""):
+        return None
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+async def cache_get_async(cache, key: str) -> Optional[Any]:
+    """
+    cache.get for event-loop callers: SQLite lookups run on the default executor
+    so disk I/O and lock waits don't stall other requests
+    """
+    if cache is None:
+        return None
+    if isinstance(cache, MemoryCache):
+        return cache.get(key)
+    return await asyncio.get_running_loop().run_in_executor(None, cache.get, key)
+
+async def cache_set_async(cache, key: str, value: Any, ttl: float = None):
+    """
+    cache.set counterpart of cache_get_async
+    """
+    if cache is None:
+        return
+    if isinstance(cache, MemoryCache):
+        cache.set(key, value, ttl)
+        return
+    await asyncio.get_running_loop().run_in_executor(None, cache.set, key, value, ttl)
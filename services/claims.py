@@ -0,0 +1,122 @@
+import re
+from collections import OrderedDict
+from typing import List
+from services.cache import normalize_claim
+
+# Abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "inc", "ltd", "co",
+    "corp", "gov", "sen", "rep", "gen", "no", "fig", "approx", "est", "jan", "feb", "mar",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "e.g", "i.e", "u.s", "u.k"
+}
+_SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)\s+(?=\S)')
+
+_NUMBER = re.compile(r'\d')
+_QUANTITY = re.compile(r'\b(percent|per cent|million|billion|trillion|thousand|hundred|half|twice|double|triple)\b|%', re.I)
+# Verbs that assert a checkable event or effect. Copulas and auxiliaries
+# ("is", "are", "has", "will") are deliberately absent: nearly every sentence has one.
+_FACT_VERB = re.compile(
+    r"\b(won|lost|caused?|causes|leads?|led|increased?|decreased?|rose|fell|grew|killed|died|built|"
+    r"invented|discovered|founded|elected|signed|passed|banned|cures?|cured|prevents?|contains?)\b", re.I
+)
+# Comparisons and absolutes only make a claim about something concrete
+_COMPARATIVE = re.compile(
+    r"\b(never|always|first|largest|biggest|smallest|highest|lowest|most|least|more|less|than)\b", re.I
+)
+_OPINION = re.compile(
+    r"\b(i think|i feel|i believe|i guess|in my opinion|personally|i love|i hate|i like|i want|"
+    r"i hope|let's|let me|you know|i mean|kind of|sort of)\b", re.I
+)
+_FILLER = re.compile(
+    r"^(thank you|thanks|hello|hi|hey|welcome|okay|ok|so|um+|uh+|yeah|yes|no|right|well|"
+    r"subscribe|like and subscribe|see you)\b[\s,.!]*$", re.I
+)
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits text into sentences on terminal punctuation, keeping common
+    abbreviations ("Dr.", "U.S.") and decimals ("3.5") intact
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if not text:
+        return []
+
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        candidate = text[start:match.end(1)]
+        last_word = candidate.rsplit(" ", 1)[-1].rstrip('.!?"\')]').lower()
+        if match.group(1).startswith(".") and (last_word in _ABBREVIATIONS or len(last_word) == 1):
+            continue
+        sentences.append(candidate.strip())
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+def check_worthiness(sentence: str) -> float:
+    """
+    Cheap 0-1 estimate of whether a sentence makes a verifiable factual claim.
+
+    Rewards numbers and quantities, named entities (capitalized words after
+    the first), verbs asserting an event or effect and, to a lesser degree,
+    comparisons; penalizes questions, first person opinions, filler and very
+    short fragments. A sentence with none of these signals ("The weather is
+    nice today.") stays at the 0.25 base.
+    """
+    words = sentence.split()
+    if len(words) < 4 or _FILLER.match(sentence.strip()):
+        return 0.0
+
+    score = 0.25
+    if _NUMBER.search(sentence):
+        score += 0.25
+    if _QUANTITY.search(sentence):
+        score += 0.15
+    if any(word[:1].isupper() for word in words[1:]):
+        score += 0.2
+    if _FACT_VERB.search(sentence):
+        score += 0.3
+    if _COMPARATIVE.search(sentence):
+        score += 0.15
+    if sentence.rstrip().endswith("?"):
+        score -= 0.4
+    if _OPINION.search(sentence):
+        score -= 0.3
+    return max(0.0, min(1.0, score))
+
+class ClaimExtractor:
+    """
+    Turns free text into the list of check-worthy claims not yet seen in this session.
+
+    Keeps an LRU set of normalized claims so overlapping transcript windows
+    and repeated selections don't re-trigger fact checks.
+    """
+    def __init__(self, threshold: float = 0.5, max_seen: int = 1000):
+        self.threshold = threshold
+        self.max_seen = max_seen
+        self._seen = OrderedDict()
+
+    def extract(self, text: str) -> List[str]:
+        claims = []
+        for sentence in split_sentences(text):
+            key = normalize_claim(sentence)
+            if not key:
+                continue
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                continue
+            if check_worthiness(sentence) < self.threshold:
+                continue
+            claims.append(sentence)
+            self._seen[key] = True
+            while len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+        return claims
+
+def extract_claims(text: str, threshold: float = 0.5) -> List[str]:
+    """
+    Stateless claim extraction: check-worthy sentences of `text`, de-duplicated
+    """
+    return ClaimExtractor(threshold=threshold).extract(text)
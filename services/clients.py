@@ -0,0 +1,220 @@
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional
+
+from services import metrics
+
+# langchain_cohere and the Tavily tooling take seconds to import, so the
+# factories import them on first use (or during warm_up)
+if TYPE_CHECKING:
+    from langchain_cohere import ChatCohere
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+DEFAULT_MODEL = "command-r-plus-08-2024"
+# "background" builds clients on a daemon thread at startup, "blocking" before
+# the app starts serving, "off" on the first request that needs them
+CLIENT_WARM_UP = os.environ.get("CLIENT_WARM_UP", "background")
+
+logger = logging.getLogger(__name__)
+
+class ClientRegistry:
+    """
+    Process-wide registry of long-lived clients.
+
+    Clients are built once per key by their factory and handed out on every
+    later lookup, so the HTTP connection pools they own stay warm between
+    requests. Lookups are thread-safe. Each key has its own build lock, so
+    a slow build (e.g. during warm-up) only holds up lookups of that key.
+    """
+    def __init__(self):
+        self._clients = {}
+        self._stats = {}
+        self._build_locks = {}
+        # Guards the stats and the build lock table; never held while a factory runs
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        client = self._clients.get(key)
+        if client is not None:
+            self._count_reuse(key)
+            return client
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        # Factories may look up other clients (an agent needs an LLM); those
+        # take their own key's lock
+        with build_lock:
+            # Re-check under the build lock so concurrent first lookups build once
+            client = self._clients.get(key)
+            if client is not None:
+                self._count_reuse(key)
+                return client
+            started = time.perf_counter()
+            client = factory()
+            with self._lock:
+                self._stats[key] = {
+                    "created_at": time.time(),
+                    "build_seconds": time.perf_counter() - started,
+                    "reuses": 0
+                }
+            self._clients[key] = client
+        return client
+
+    def _count_reuse(self, key: Hashable):
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is not None:
+                entry["reuses"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._stats.clear()
+            self._build_locks.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pool_size": len(self._clients),
+                "clients": {
+                    ":".join(map(str, key)) if isinstance(key, tuple) else str(key): dict(entry)
+                    for key, entry in self._stats.items()
+                }
+            }
+
+registry = ClientRegistry()
+
+@lru_cache(maxsize=None)
+def _upstream_metrics_class():
+    # Defined on first use so importing this module doesn't load langchain_core
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UpstreamMetrics(BaseCallbackHandler):
+        """
+        Counts and times every call a shared client makes to its upstream API,
+        including the calls made from inside agent executors, and tallies LLM tokens
+        """
+        def __init__(self, upstream: str):
+            self.upstream = upstream
+            self._started = {}
+
+        def _start(self, run_id):
+            self._started[run_id] = time.perf_counter()
+            metrics.count("upstream_calls_total", upstream=self.upstream)
+
+        def _finish(self, run_id, error: BaseException = None):
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            metrics.record(self.upstream, started, time.perf_counter() - started,
+                           type(error).__name__ if error else None)
+            if error:
+                metrics.count("upstream_errors_total", upstream=self.upstream)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._start(run_id)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._start(run_id)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            self._finish(run_id)
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None) or \
+                        (generation.generation_info or {}).get("token_count") or {}
+                    for kind in ("input_tokens", "output_tokens"):
+                        if usage.get(kind):
+                            metrics.count("upstream_tokens_total", usage[kind], upstream=self.upstream,
+                                          kind=kind.split("_")[0])
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id, error)
+
+        def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+            self._start(run_id)
+
+        def on_tool_end(self, output, *, run_id, **kwargs):
+            self._finish(run_id)
+
+        def on_tool_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id, error)
+
+    return UpstreamMetrics
+
+def upstream_metrics(upstream: str):
+    """
+    Callback handler that records the calls a client makes to `upstream`
+    """
+    return _upstream_metrics_class()(upstream)
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = 0) -> "ChatCohere":
+    """
+    Returns the shared ChatCohere client for the given model
+    """
+    def build():
+        from langchain_cohere import ChatCohere
+        return ChatCohere(
+            cohere_api_key=os.environ['COHERE_API_KEY'],
+            model=model,
+            temperature=temperature,
+            # Overridable so benchmarks can point at a local stand-in (benchmarks/stubs.py)
+            base_url=os.environ.get('COHERE_BASE_URL'),
+            callbacks=[upstream_metrics("cohere")]
+        )
+
+    return registry.get(("llm", model, temperature), build)
+
+def get_search_tool(name: str = None, description: str = None, args_schema=None) -> "TavilySearchResults":
+    """
+    Returns the shared Tavily search tool, optionally renamed for use by an agent
+    """
+    def build():
+        from langchain_community.tools.tavily_search import TavilySearchResults
+        from langchain_community.utilities import tavily_search
+
+        if os.environ.get('TAVILY_BASE_URL'):
+            # The Tavily wrapper reads its endpoint from a module constant
+            tavily_search.TAVILY_API_URL = os.environ['TAVILY_BASE_URL']
+        tool = TavilySearchResults(include_answer=True, callbacks=[upstream_metrics("tavily")])
+        if name:
+            tool.name = name
+        if description:
+            tool.description = description
+        if args_schema:
+            tool.args_schema = args_schema
+        return tool
+
+    return registry.get(("search", name or "default"), build)
+
+def warm_up(*builders: Callable[[], Any], mode: str = None) -> Optional[threading.Thread]:
+    """
+    Runs `builders` (functions that build registry clients) ahead of the first
+    request, per CLIENT_WARM_UP unless `mode` is given. A request that needs a
+    client while it is still being built waits for it in the registry rather
+    than building a second one. Returns the warm-up thread in background mode.
+    """
+    mode = mode or CLIENT_WARM_UP
+    if mode == "off":
+        return None
+
+    def run():
+        started = time.perf_counter()
+        for build in builders:
+            try:
+                build()
+            except Exception as e:
+                logger.error(f"Client warm-up failed in {getattr(build, '__name__', build)}: {e}")
+        logger.info(f"Clients warmed up in {time.perf_counter() - started:.2f}s")
+
+    if mode == "blocking":
+        run()
+        return None
+    thread = threading.Thread(target=run, name="client-warm-up", daemon=True)
+    thread.start()
+    return thread
+
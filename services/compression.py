@@ -0,0 +1,31 @@
+import gzip
+import os
+from flask import request
+
+# Bodies smaller than this aren't worth a gzip header and the CPU
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "6"))
+
+def enable_compression(app, min_bytes: int = COMPRESS_MIN_BYTES, level: int = COMPRESS_LEVEL):
+    """
+    Gzips a Flask app's buffered responses for clients that accept it.
+    Streamed responses (NDJSON, SSE) pass through untouched so their events
+    aren't held back by the compressor.
+    """
+    @app.after_request
+    def compress(response):
+        if (response.is_streamed or response.direct_passthrough
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or "Content-Encoding" in response.headers):
+            return response
+        response.vary.add("Accept-Encoding")
+        if not request.accept_encodings["gzip"]:
+            return response
+        data = response.get_data()
+        if len(data) < min_bytes:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    return app
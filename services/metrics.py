@@ -0,0 +1,259 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# METRICS_ENABLED=0 turns spans and counters into no-ops
+ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+# Log each finished request trace as one JSON line (logger "services.metrics")
+LOG_TRACES = os.environ.get("METRICS_LOG_TRACES", "0") == "1"
+
+# Seconds; spans cover everything from sub-millisecond parsing to minute-long agent runs
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _label_key(labels: dict):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+class MetricsRegistry:
+    """
+    In-process counters, duration histograms and gauges, rendered in the
+    Prometheus text exposition format.
+    """
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._gauges = {}  # name -> callable read at scrape time
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, help: str = None, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name: str, seconds: float, help: str = None, **labels):
+        key = (name, _label_key(labels))
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += seconds
+            entry[-1] += 1
+            if help:
+                self._help.setdefault(name, help)
+
+    def gauge(self, name: str, read, help: str = None):
+        """
+        Registers a gauge evaluated at scrape time; `read` returns a number,
+        or a dict of {((label, value), ...): number} for labelled series
+        """
+        with self._lock:
+            self._gauges[name] = read
+            if help:
+                self._help[name] = help
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(entry) for key, entry in self._histograms.items()}
+            gauges = dict(self._gauges)
+            help_texts = dict(self._help)
+
+        lines = []
+        def header(name, kind):
+            if name in help_texts:
+                lines.append(f"# HELP {name} {help_texts[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name in sorted({name for name, _ in counters}):
+            header(name, "counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        for name in sorted({name for name, _ in histograms}):
+            header(name, "histogram")
+            for (metric, labels), entry in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {entry[-1]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {entry[-2]:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {entry[-1]}")
+
+        for name, read in sorted(gauges.items()):
+            try:
+                value = read()
+            except Exception as e:
+                logger.warning(f"Gauge {name} failed: {e}")
+                continue
+            header(name, "gauge")
+            values = value.items() if isinstance(value, dict) else [((), value)]
+            for labels, number in values:
+                if number is not None:
+                    lines.append(f"{name}{_format_labels(tuple(labels))} {float(number):g}")
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+registry = MetricsRegistry()
+
+class Trace:
+    """
+    The spans recorded while serving one request, in start order
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, started: float, duration: float, error: str = None):
+        span = {"name": name, "start_ms": round((started - self.started) * 1000, 2),
+                "duration_ms": round(duration * 1000, 2)}
+        if error:
+            span["error"] = error
+        # Stances record spans from several threads into the same trace
+        with self._lock:
+            self.spans.append(span)
+
+    def server_timing(self) -> str:
+        """
+        Value for the Server-Timing response header
+        """
+        with self._lock:
+            spans = list(self.spans)
+        return ", ".join(f'{span["name"]};dur={span["duration_ms"]}' for span in spans)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+        return {"trace_id": self.trace_id, "name": self.name,
+                "duration_ms": round((time.perf_counter() - self.started) * 1000, 2), "spans": spans}
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+def current_trace():
+    return _current_trace.get()
+
+@contextmanager
+def trace(name: str):
+    """
+    Collects the spans of one request. Worker threads join the trace when
+    they run inside a copy of the caller's context (contextvars.copy_context,
+    asyncio.to_thread).
+    """
+    if not ENABLED:
+        yield None
+        return
+    request_trace = Trace(name)
+    token = _current_trace.set(request_trace)
+    try:
+        with span(name):
+            yield request_trace
+    finally:
+        _current_trace.reset(token)
+        if LOG_TRACES:
+            logger.info(json.dumps(request_trace.to_dict()))
+
+def record(name: str, started: float, duration: float, error: str = None, **labels):
+    """
+    Records a finished stage that was timed elsewhere (perf_counter seconds)
+    """
+    if not ENABLED:
+        return
+    registry.observe("stage_duration_seconds", duration, help="Time spent per pipeline stage",
+                     stage=name, **labels)
+    if error:
+        registry.inc("stage_errors_total", help="Stages that raised", stage=name, error=error, **labels)
+    request_trace = _current_trace.get()
+    if request_trace is not None:
+        request_trace.add(name, started, duration, error)
+
+@contextmanager
+def _span(name: str, labels: dict):
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record(name, started, time.perf_counter() - started, error, **labels)
+
+class _NoSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+def span(name: str, **labels):
+    """
+    Times a stage: feeds the stage_duration_seconds histogram and, inside
+    trace(), the current request's trace
+    """
+    if not ENABLED:
+        return _NO_SPAN
+    return _span(name, labels)
+
+def timed(name: str, **labels):
+    """
+    Decorator form of span()
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name: str, value: float = 1, **labels):
+    if ENABLED:
+        registry.inc(name, value, **labels)
+
+def observe(name: str, seconds: float, **labels):
+    if ENABLED:
+        registry.observe(name, seconds, **labels)
+
+def gauge(name: str, read, help: str = None):
+    if ENABLED:
+        registry.gauge(name, read, help)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def render() -> str:
+    return registry.render() if ENABLED else "# metrics disabled (METRICS_ENABLED=0)\n"
@@ -1,11 +1,28 @@
-from langchain_community.tools.tavily_search import TavilySearchResults
+import os
+import asyncio
+import threading
+from concurrent.futures import Future
+from services.cache import create_cache, cache_get_async, cache_key, cache_set_async
+from services.clients import get_search_tool
+from services import metrics
 
-def perform_search(query):
-    """
-    Executes a Tavily search and returns the results.
-    """
-    search_tool = TavilySearchResults(include_answer=True)
-    results = search_tool.invoke({"query": query})
+# Search-layer cache, keyed on the normalized query text
+search_cache = create_cache(
+    os.environ.get("SEARCH_CACHE", "memory"),
+    path=os.environ.get("SEARCH_CACHE_PATH", "search_cache.sqlite3"),
+    max_size=int(os.environ.get("SEARCH_CACHE_SIZE", "2048")),
+    ttl=float(os.environ.get("SEARCH_CACHE_TTL", "21600"))
+)
+# Key on the claim's content-word fingerprint, so lightly padded repeats of a
+# claim share results (see services.cache.claim_fingerprint)
+SEARCH_CACHE_FINGERPRINT = os.environ.get("SEARCH_CACHE_FINGERPRINT", "0") == "1"
+
+# Upstream searches currently running, so identical concurrent queries share one call
+_inflight = {}
+_inflight_lock = threading.Lock()
+_stats = {"upstream_calls": 0, "coalesced": 0}
+
+def _format_results(results):
     return [
         {
             "url": result.get("url", "No URL"),
@@ -13,3 +30,95 @@ def perform_search(query):
         }
         for result in results
     ]
+
+def search_key(query: str) -> str:
+    return cache_key(query, fingerprint=SEARCH_CACHE_FINGERPRINT, namespace="search")
+
+def _search_upstream(query):
+    search_tool = get_search_tool()
+    return _format_results(search_tool.invoke({"query": query}))
+
+@metrics.timed("search")
+def perform_search(query):
+    """
+    Executes a Tavily search and returns the results.
+
+    Results are served from the search cache when possible; concurrent callers
+    asking for the same normalized query wait on a single upstream request.
+    """
+    key = search_key(query)
+    if search_cache is not None:
+        cached = search_cache.get(key)
+        if cached is not None:
+            metrics.count("search_requests_total", result="cache_hit")
+            return cached
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+        else:
+            _stats["coalesced"] += 1
+
+    if not leader:
+        metrics.count("search_requests_total", result="coalesced")
+        return future.result()
+
+    metrics.count("search_requests_total", result="upstream")
+
+    try:
+        _stats["upstream_calls"] += 1
+        results = _search_upstream(query)
+        if search_cache is not None:
+            search_cache.set(key, results)
+        future.set_result(results)
+        return results
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+# asyncio counterpart of _inflight; only touched from the event loop thread
+_inflight_async = {}
+
+async def perform_search_async(query):
+    """
+    Async variant of perform_search sharing the same cache.
+    """
+    key = search_key(query)
+    cached = await cache_get_async(search_cache, key)
+    if cached is not None:
+        metrics.count("search_requests_total", result="cache_hit")
+        return cached
+
+    task = _inflight_async.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+        metrics.count("search_requests_total", result="coalesced")
+        return await asyncio.shield(task)
+
+    metrics.count("search_requests_total", result="upstream")
+
+    async def fetch():
+        try:
+            _stats["upstream_calls"] += 1
+            with metrics.span("search"):
+                results = _format_results(await get_search_tool().ainvoke({"query": query}))
+            await cache_set_async(search_cache, key, results)
+            return results
+        finally:
+            _inflight_async.pop(key, None)
+
+    task = asyncio.ensure_future(fetch())
+    _inflight_async[key] = task
+    return await asyncio.shield(task)
+
+def search_stats():
+    with _inflight_lock:
+        stats = dict(_stats, inflight=len(_inflight) + len(_inflight_async))
+    stats["cache"] = search_cache.stats() if search_cache is not None else {"backend": "off"}
+    return stats
@@ -0,0 +1,223 @@
+import hashlib
+import heapq
+import os
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from services.cache import create_cache, normalize_claim
+from services import metrics
+
+# Characters of each source's content shipped in responses (0: no cap); the
+# full text stays in source_store and is served by the /sources/<id> routes
+SOURCE_CONTENT_CHARS = int(os.environ.get("SOURCE_CONTENT_CHARS", "300"))
+# Estimated Jaccard similarity of word shingles above which two snippets are the same text (0: off)
+SOURCE_SIMILARITY = float(os.environ.get("SOURCE_SIMILARITY", "0.7"))
+SHINGLE_WORDS = 3
+MINHASH_SIZE = 64
+
+# Query parameters that identify a campaign or referrer, not the document
+_TRACKING_PARAMS = frozenset((
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "yclid",
+    "ref", "ref_src", "ref_url", "source", "_ga", "_gl", "cmpid", "ocid", "smid",
+))
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Cached /invoke responses link to their truncated sources by id, so by
+# default the store follows the claim cache: SQLite when the claim cache
+# survives restarts, room for SOURCES_PER_RESPONSE sources of every cached
+# response, and twice its TTL
+SOURCES_PER_RESPONSE = 20  # 2 stances x up to 10 sources
+source_store = create_cache(
+    os.environ.get("SOURCE_STORE", "sqlite" if os.environ.get("CLAIM_CACHE", "").lower() == "sqlite" else "memory"),
+    path=os.environ.get("SOURCE_STORE_PATH", "source_store.sqlite3"),
+    max_size=int(os.environ.get(
+        "SOURCE_STORE_SIZE", SOURCES_PER_RESPONSE * int(os.environ.get("CLAIM_CACHE_SIZE", "1024"))
+    )),
+    ttl=float(os.environ.get("SOURCE_STORE_TTL", 2 * float(os.environ.get("CLAIM_CACHE_TTL", "3600"))))
+)
+
+def canonical_url(url: str) -> str:
+    """
+    Lowercases the scheme and host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query so the same
+    page cited through different links compares equal. Anything that isn't an
+    absolute URL is returned stripped but otherwise unchanged.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in _DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), query, ""))
+
+def _url_key(url: str, text: str) -> str:
+    # http and https copies of a page are the same source; without a usable
+    # URL only an identical snippet is
+    if "://" not in url:
+        return f"{url}\n{text}"
+    return url.split("://", 1)[1]
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set:
+    """
+    Overlapping runs of `size` words of the normalized text
+    """
+    words = normalize_claim(text).split()
+    return {" ".join(words[index:index + size]) for index in range(max(1, len(words) - size + 1))}
+
+def minhash(shingle_set: set) -> frozenset:
+    """
+    Bottom-k MinHash sketch: the MINHASH_SIZE smallest hashes of the shingles.
+    One hash per shingle instead of one per permutation keeps it cheap in
+    pure Python. Python's string hash is salted per process, which is fine
+    as sketches are only compared within one normalize_sources call.
+    """
+    return frozenset(heapq.nsmallest(MINHASH_SIZE, {hash(shingle) for shingle in shingle_set}))
+
+def estimated_similarity(sketch: frozenset, other_sketch: frozenset) -> float:
+    """
+    Estimates the Jaccard similarity of two shingle sets from their sketches:
+    the share of the union's MINHASH_SIZE smallest hashes that both sets contain
+    """
+    union = sorted(sketch | other_sketch)[:MINHASH_SIZE]
+    if not union:
+        return 0.0
+    both = sketch & other_sketch
+    return sum(1 for value in union if value in both) / len(union)
+
+def truncate(text: str, max_chars: int):
+    """
+    Cuts `text` at a word boundary near `max_chars`; returns (text, truncated)
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text, False
+    cut = text.rfind(" ", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return text[:cut].rstrip() + "…", True
+
+def source_id(url: str, content: str) -> str:
+    return hashlib.sha1(f"{url}\n{content}".encode("utf-8")).hexdigest()[:16]
+
+def _add_also_at(target: dict, urls):
+    also_at = target.setdefault("also_at", [])
+    for url in urls:
+        if url != target["url"] and url not in also_at:
+            also_at.append(url)
+    if not also_at:
+        del target["also_at"]
+
+def normalize_sources(sources: List[Dict], max_chars: int = SOURCE_CONTENT_CHARS,
+                      similarity: float = SOURCE_SIMILARITY) -> List[Dict[str, str]]:
+    """
+    Canonicalizes source URLs and collapses duplicates, keeping the first
+    (highest ranked) occurrence in order:
+
+    - the same canonical URL: the longer snippet is kept
+    - the same normalized text under another URL, or text whose MinHash
+      similarity reaches `similarity` (syndicated copies, mirrors): the
+      other URLs are listed under "also_at"
+
+    Already normalized lists can be normalized again (e.g. after merging two
+    of them); their "also_at" lists are carried over, and truncated sources
+    are restored from source_store before being compared and cut again. One
+    whose full text has expired stays as it is, still marked truncated.
+
+    Content longer than `max_chars` is cut and marked "truncated"; its full
+    text is kept in source_store under the source's "id" for expand_source.
+    """
+    kept = []
+    by_url = {}
+    by_text = {}
+    signatures = []  # (index into kept, MinHash signature)
+
+    for source in sources:
+        url = canonical_url(source.get("url"))
+        content = (source.get("content") or "").strip()
+        # Only the cut text is left of a source truncated by an earlier pass
+        # whose full text is gone; its id still names it
+        cut_id = None
+        if source.get("truncated"):
+            stored = expand_source(source["id"]) if source.get("id") else None
+            if stored is not None:
+                content = stored["content"]
+            else:
+                cut_id = source.get("id", "")
+        text = normalize_claim(content)
+        # Snippets shorter than a few shingles are too generic to compare by text
+        comparable = len(text.split()) >= 2 * SHINGLE_WORDS
+
+        url_key = _url_key(url, text)
+        index = by_url.get(url_key)
+        if index is not None:
+            metrics.count("sources_collapsed_total", reason="url")
+            if kept[index]["url"] == url and len(content) > len(kept[index]["content"]):
+                kept[index]["content"] = content
+                kept[index].pop("_cut_id", None)
+                if cut_id is not None:
+                    kept[index]["_cut_id"] = cut_id
+            _add_also_at(kept[index], source.get("also_at", ()))
+            continue
+
+        signature = None
+        if comparable:
+            index = by_text.get(text)
+            reason = "exact"
+            if index is None and similarity:
+                signature = minhash(shingles(text))
+                for other, other_signature in signatures:
+                    if estimated_similarity(signature, other_signature) >= similarity:
+                        index = other
+                        reason = "near"
+                        break
+            if index is not None:
+                metrics.count("sources_collapsed_total", reason=reason)
+                _add_also_at(kept[index], [url, *source.get("also_at", ())])
+                by_url[url_key] = index
+                continue
+
+        index = len(kept)
+        kept.append({"url": url, "content": content})
+        if cut_id is not None:
+            kept[index]["_cut_id"] = cut_id
+        _add_also_at(kept[index], source.get("also_at", ()))
+        by_url[url_key] = index
+        if comparable:
+            by_text[text] = index
+            if signature is not None:
+                signatures.append((index, signature))
+
+    for source in kept:
+        cut_id = source.pop("_cut_id", None)
+        if cut_id is not None:
+            source["truncated"] = True
+            if cut_id:
+                source["id"] = cut_id
+            continue
+        full_content = source["content"]
+        source["content"], truncated = truncate(full_content, max_chars)
+        if truncated:
+            source["truncated"] = True
+            if source_store is not None:
+                source["id"] = source_id(source["url"], full_content)
+                source_store.set(source["id"], {"id": source["id"], "url": source["url"], "content": full_content})
+    return kept
+
+def expand_source(key: str) -> Optional[Dict[str, str]]:
+    """
+    Full text of a truncated source by its "id", or None once it has expired from source_store
+    """
+    if source_store is None:
+        return None
+    return source_store.get(key)
@@ -0,0 +1,194 @@
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+def _seconds(value, name: str) -> float:
+    # bool is an int, but never a meaningful timestamp
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number of seconds")
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number of seconds") from None
+    if not math.isfinite(seconds):
+        raise ValueError(f"{name} must be finite")
+    return seconds
+
+class SessionTranscript:
+    """
+    Timestamped transcript segments of one capture session, oldest first.
+
+    Segments arrive in capture order, so start times and sequence numbers
+    are both sorted and window/delta queries are binary searches. Only the
+    last `retention_seconds` of audio and at most `max_segments` segments
+    are kept.
+    """
+    def __init__(self, retention_seconds: float, max_segments: int):
+        self.retention_seconds = retention_seconds
+        self.max_segments = max_segments
+        self.segments = []
+        self._starts = []
+        self._seqs = []
+        self.last_active = time.monotonic()
+
+    def append(self, segment: dict):
+        self.segments.append(segment)
+        self._starts.append(segment["start"])
+        self._seqs.append(segment["seq"])
+        self.last_active = time.monotonic()
+        self._trim(segment["end"] - self.retention_seconds)
+
+    def _trim(self, cutoff: float):
+        # Drop in one slice rather than popping from the front one at a time
+        drop = max(bisect_left(self._starts, cutoff), len(self.segments) - self.max_segments)
+        if drop > 0:
+            del self.segments[:drop], self._starts[:drop], self._seqs[:drop]
+
+    def since(self, seq: int):
+        return self.segments[bisect_right(self._seqs, seq):]
+
+    def between(self, start: float = None, end: float = None):
+        """
+        Segments that overlap [start, end) in capture time; None leaves that side open
+        """
+        lo = 0
+        if start is not None:
+            # A segment starting before `start` can still run into the window
+            lo = bisect_left(self._starts, start)
+            if lo > 0 and self.segments[lo - 1]["end"] > start:
+                lo -= 1
+        hi = len(self.segments) if end is None else bisect_left(self._starts, end)
+        return self.segments[lo:hi]
+
+class TranscriptStore:
+    """
+    Transcript segments for many concurrent capture sessions.
+
+    Every segment gets a store-wide increasing sequence number, so readers
+    can resume with since()/wait_since() and never see numbers go backwards
+    even if their session was evicted and recreated. Sessions without new
+    segments for `idle_seconds` are dropped.
+    """
+    def __init__(self, retention_seconds: float = 600, max_segments: int = 1000,
+                 idle_seconds: float = 1800, max_sessions: int = 100):
+        self.retention_seconds = retention_seconds
+        self.max_segments = max_segments
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._cond = threading.Condition()
+        self._last_seq = 0
+        self.evicted_sessions = 0
+        self.rejected_segments = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def publish(self, session: str, text: str, start: float = None, end: float = None) -> dict:
+        """
+        Appends a segment spoken between `start` and `end` (Unix seconds,
+        both default to now) to `session`.
+
+        Raises ValueError if the times aren't finite numbers, `end` precedes
+        `start`, or `start` precedes the session's last segment: segments
+        must arrive in capture order.
+        """
+        with self._cond:
+            try:
+                end = time.time() if end is None else _seconds(end, "end")
+                start = end if start is None else _seconds(start, "start")
+                if end < start:
+                    raise ValueError("end must not precede start")
+                transcript = self._sessions.get(session)
+                if transcript is not None and transcript.segments and start < transcript.segments[-1]["start"]:
+                    raise ValueError(f"start {start} precedes the session's last segment "
+                                     f"({transcript.segments[-1]['start']})")
+            except ValueError:
+                self.rejected_segments += 1
+                raise
+            if transcript is None:
+                self._evict_idle()
+                transcript = self._sessions[session] = SessionTranscript(self.retention_seconds, self.max_segments)
+            self._last_seq += 1
+            segment = {"seq": self._last_seq, "session": session, "start": start, "end": end,
+                       "timestamp": end, "text": text}
+            transcript.append(segment)
+            self._cond.notify_all()
+            return segment
+
+    def since(self, session: str, seq: int):
+        with self._cond:
+            transcript = self._sessions.get(session)
+            return transcript.since(seq) if transcript else []
+
+    def wait_since(self, session: str, seq: int, timeout: float = None):
+        """
+        Returns the segments of `session` newer than `seq`, blocking up to
+        `timeout` seconds for one to arrive; an empty list means the wait timed out
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._session_seq(session) > seq, timeout=timeout)
+            transcript = self._sessions.get(session)
+            return transcript.since(seq) if transcript else []
+
+    def wait_all_since(self, seq: int, timeout: float = None):
+        """
+        Segments of every session newer than `seq`, in sequence order,
+        blocking up to `timeout` seconds for one to arrive. Returns
+        (last_seq, segments); resume from last_seq, which also skips
+        segments that were trimmed or evicted before they could be read.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_seq > seq, timeout=timeout)
+            segments = [segment for transcript in self._sessions.values() for segment in transcript.since(seq)]
+            last_seq = self._last_seq
+        segments.sort(key=lambda segment: segment["seq"])
+        return last_seq, segments
+
+    def window(self, session: str, seconds: float = None, start: float = None, end: float = None):
+        """
+        Segments of `session` in the last `seconds` of capture time, or
+        between the absolute times `start` and `end`
+        """
+        if seconds is not None:
+            start = time.time() - seconds
+        with self._cond:
+            transcript = self._sessions.get(session)
+            return transcript.between(start, end) if transcript else []
+
+    def _session_seq(self, session: str) -> int:
+        transcript = self._sessions.get(session)
+        return transcript.segments[-1]["seq"] if transcript and transcript.segments else 0
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        idle = [name for name, transcript in self._sessions.items() if transcript.last_active < cutoff]
+        # Past the session cap, the least recently active sessions go as well
+        overflow = len(self._sessions) - len(idle) - self.max_sessions + 1
+        if overflow > 0:
+            active = sorted((transcript.last_active, name) for name, transcript in self._sessions.items()
+                            if name not in idle)
+            idle.extend(name for _, name in active[:overflow])
+        for name in idle:
+            del self._sessions[name]
+        self.evicted_sessions += len(idle)
+
+    def evict_idle(self):
+        with self._cond:
+            self._evict_idle()
+
+    def sessions(self):
+        with self._cond:
+            return list(self._sessions)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "sessions": len(self._sessions),
+                "segments": sum(len(transcript.segments) for transcript in self._sessions.values()),
+                "evicted_sessions": self.evicted_sessions,
+                "rejected_segments": self.rejected_segments,
+                "last_seq": self._last_seq
+            }
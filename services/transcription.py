@@ -0,0 +1,175 @@
+import logging
+import os
+import threading
+import time
+from typing import List
+import numpy as np
+from processing.encoding import encode_wav, to_int16
+
+SAMPLE_RATE = 16000
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionBackend:
+    """
+    Interface for speech-to-text engines. Audio is always 16 kHz mono float32.
+    """
+    name = "base"
+
+    def load(self):
+        """
+        Loads models or clients; called once before the first transcription
+        """
+
+    def warm_up(self):
+        """
+        Runs one throwaway transcription so the first real segment doesn't pay for lazy initialization
+        """
+        self.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        raise NotImplementedError("This method must be implemented by subclasses.")
+
+    def transcribe_batch(self, segments: List[np.ndarray]) -> List[str]:
+        return [self.transcribe(audio) for audio in segments]
+
+class GroqBackend(TranscriptionBackend):
+    """
+    Remote transcription through Groq's hosted Whisper
+    """
+    name = "groq"
+
+    def __init__(self, model: str = "whisper-large-v3-turbo", language: str = "en"):
+        self.model = model
+        self.language = language
+        self.client = None
+
+    def load(self):
+        from groq import Groq
+        self.client = Groq()
+
+    def warm_up(self):
+        # A remote call would only cost money; the client is ready once constructed
+        pass
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        wav_bytes = encode_wav(to_int16(audio), 1, SAMPLE_RATE)
+        transcription = self.client.audio.transcriptions.create(
+            file=(f"segment_{time.time()}.wav", wav_bytes),
+            model=self.model,
+            response_format="json",
+            language=self.language,
+            temperature=0.0
+        )
+        return transcription.text
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Offline transcription on CPU.
+
+    Uses faster-whisper (CTranslate2, int8 quantized by default) when it is
+    installed, falling back to openai-whisper. Several segments are batched
+    into a single inference call by joining them with short silences and
+    mapping the timestamped output back to the segment each piece started in.
+    """
+    name = "local"
+
+    def __init__(self, model_size: str = "base", device: str = "cpu", compute_type: str = "int8",
+                 language: str = "en", batch_gap_seconds: float = 0.5):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.language = language
+        self.batch_gap = np.zeros(int(SAMPLE_RATE * batch_gap_seconds), dtype=np.float32)
+        self.engine = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            from faster_whisper import WhisperModel
+            self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+            self.engine = "faster-whisper"
+        except ImportError:
+            import whisper
+            self.model = whisper.load_model(self.model_size, device=self.device)
+            self.engine = "openai-whisper"
+
+    def _segments(self, audio: np.ndarray):
+        """
+        Runs the model and returns (start_seconds, text) pieces
+        """
+        # Neither engine is safe to drive from several threads at once on CPU
+        with self._lock:
+            if self.engine == "faster-whisper":
+                segments, _ = self.model.transcribe(audio, language=self.language, beam_size=1)
+                return [(segment.start, segment.text) for segment in segments]
+            result = self.model.transcribe(audio, language=self.language, fp16=False)
+            return [(segment["start"], segment["text"]) for segment in result["segments"]]
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        return "".join(text for _, text in self._segments(audio)).strip()
+
+    def transcribe_batch(self, segments: List[np.ndarray]) -> List[str]:
+        if len(segments) <= 1:
+            return [self.transcribe(audio) for audio in segments]
+
+        # Lay the segments end to end and remember where each one starts
+        parts = []
+        offsets = []
+        position = 0
+        for audio in segments:
+            offsets.append(position / SAMPLE_RATE)
+            parts.extend([audio, self.batch_gap])
+            position += len(audio) + len(self.batch_gap)
+
+        texts = [[] for _ in segments]
+        for start, text in self._segments(np.concatenate(parts)):
+            index = max(0, int(np.searchsorted(offsets, start, side="right")) - 1)
+            texts[index].append(text)
+        return ["".join(pieces).strip() for pieces in texts]
+
+BACKENDS = {
+    GroqBackend.name: GroqBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+def get_backend(name: str = None, warm_up: bool = False, **kwargs) -> TranscriptionBackend:
+    """
+    Returns the process-wide backend for `name` (default: TRANSCRIPTION_BACKEND,
+    then "groq"), loading it on first use
+    """
+    name = name or os.environ.get("TRANSCRIPTION_BACKEND", "groq")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {name}")
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = BACKENDS[name](**kwargs)
+            backend.load()
+            if warm_up:
+                backend.warm_up()
+            _instances[name] = backend
+    return backend
+
+def preload(name: str = None, **kwargs) -> threading.Thread:
+    """
+    Loads and warms up a backend on a daemon thread so the caller can start
+    serving or capturing straight away. The first transcription that arrives
+    before loading finishes waits for it in get_backend.
+    """
+    def load():
+        started = time.perf_counter()
+        try:
+            backend = get_backend(name, warm_up=True, **kwargs)
+        except Exception as e:
+            logger.error(f"Preloading transcription backend {name or ''} failed: {e}")
+            return
+        logger.info(f"Transcription backend {backend.name} ready in {time.perf_counter() - started:.2f}s")
+
+    thread = threading.Thread(target=load, name="transcription-preload", daemon=True)
+    thread.start()
+    return thread
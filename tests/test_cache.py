@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import pytest
+from services import cache as cache_module
+from services.cache import (
+    MemoryCache, SQLiteCache, cache_get_async, cache_key, cache_set_async, claim_fingerprint, create_cache, normalize_claim
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake)
+    return fake
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemoryCache(**kwargs)
+        return SQLiteCache(path=str(tmp_path / "cache.sqlite3"), **kwargs)
+    return make
+
+def test_normalize_claim_folds_case_punctuation_and_whitespace():
+    assert normalize_claim("  The  Eiffel Tower, in PARIS! ") == "the eiffel tower in paris"
+
+def test_fingerprint_ignores_padding_but_keeps_word_order():
+    assert claim_fingerprint("So the tower is in Paris") == claim_fingerprint("The tower is in Paris.")
+    assert claim_fingerprint("Dogs chase cats") != claim_fingerprint("Cats chase dogs")
+    assert claim_fingerprint("France beat Brazil") != claim_fingerprint("Brazil beat France")
+    assert claim_fingerprint("It is not safe") != claim_fingerprint("It is safe")
+
+def test_cache_key_uses_the_fingerprint_only_when_asked():
+    assert cache_key("So the tower is in Paris", fingerprint=True) == cache_key("The tower is in Paris", fingerprint=True)
+    assert cache_key("So the tower is in Paris") != cache_key("The tower is in Paris")
+    assert cache_key("claim", namespace="search") != cache_key("claim", namespace="claim")
+
+def test_entries_expire_after_their_ttl(make_cache, clock):
+    cache = make_cache(ttl=10)
+    cache.set("default", {"value": 1})
+    cache.set("short", {"value": 2}, ttl=1)
+    clock.now += 5
+    assert cache.get("default") == {"value": 1}
+    assert cache.get("short") is None
+    clock.now += 6
+    assert cache.get("default") is None
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 2
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(max_size=2)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    clock.now += 1
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path=path).set("key", {"verdict": True})
+    assert SQLiteCache(path=path).get("key") == {"verdict": True}
+
+def test_create_cache_backends(tmp_path):
+    assert isinstance(create_cache("memory", path="ignored", max_size=1, ttl=1), MemoryCache)
+    assert isinstance(create_cache("sqlite", path=str(tmp_path / "c.sqlite3")), SQLiteCache)
+    assert create_cache("off") is None
+    with pytest.raises(ValueError):
+        create_cache("redis")
+
+def test_async_access_keeps_sqlite_off_the_event_loop(make_cache, monkeypatch):
+    cache = make_cache()
+    threads = []
+    get = cache.get
+    monkeypatch.setattr(cache, "get", lambda key: threads.append(threading.current_thread()) or get(key))
+
+    async def round_trip():
+        await cache_set_async(cache, "key", {"verdict": True})
+        return await cache_get_async(cache, "key"), await cache_get_async(None, "key")
+
+    assert asyncio.run(round_trip()) == ({"verdict": True}, None)
+    assert (threads[0] is threading.main_thread()) == isinstance(cache, MemoryCache)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from processing.ring_buffer import AudioRingBuffer
+from processing.vad import SpeechSegmenter
+
+RATE = 16000
+
+def tone_bursts(pattern, rate=RATE):
+    """
+    Concatenates (seconds, voiced) pieces: a 220 Hz tone or near-silence
+    """
+    rng = np.random.default_rng(0)
+    pieces = []
+    for seconds, voiced in pattern:
+        t = np.arange(int(seconds * rate)) / rate
+        pieces.append(0.5 * np.sin(2 * np.pi * 220 * t) if voiced else 1e-4 * rng.standard_normal(len(t)))
+    return np.concatenate(pieces).astype(np.float32)
+
+def test_segments_carry_stream_positions_when_read_from_a_backlog():
+    ring = AudioRingBuffer(RATE * 10, 1, rate=RATE)
+    with pytest.raises(ValueError):
+        ring.frame_time(0)
+    # Everything is written before the reader starts, as when the capture falls behind
+    ring.write(np.zeros((RATE * 4, 1), dtype=np.float32))
+    starts = []
+    for _ in range(3):
+        ring.read_segment(RATE, overlap=RATE // 2)
+        starts.append(ring.segment_start)
+    assert starts == [0, RATE // 2, RATE + RATE // 2]
+    assert ring.frame_time(RATE) - ring.frame_time(0) == pytest.approx(1.0)
+
+def test_segmenter_reports_utterance_positions_in_order():
+    audio = tone_bursts([(1, False), (2, True), (1, False), (3, True), (2, False)])
+    segmenter = SpeechSegmenter(RATE, pre_roll_ms=0, min_utterance_ms=500, merge_gap_ms=300)
+    utterances = []
+    block = RATE // 2
+    for offset in range(0, len(audio), block):
+        utterances += segmenter.feed(audio[offset:offset + block], offset)
+    utterances += segmenter.flush()
+
+    starts = [start for start, _ in utterances]
+    assert len(utterances) == 2
+    assert starts == sorted(starts)
+    assert starts[0] == pytest.approx(RATE, abs=RATE * 0.05)
+    assert starts[1] == pytest.approx(4 * RATE, abs=RATE * 0.05)
+
+def test_segmenter_position_follows_gaps_in_the_stream():
+    audio = tone_bursts([(1, False), (2, True), (1, False)])
+    segmenter = SpeechSegmenter(RATE, pre_roll_ms=0, min_utterance_ms=500)
+    # The first ten seconds of the stream were dropped before the segmenter saw them
+    utterances = segmenter.feed(audio, 10 * RATE) + segmenter.flush()
+    assert utterances[0][0] == pytest.approx(11 * RATE, abs=RATE * 0.05)
@@ -0,0 +1,48 @@
+import pytest
+from services.claims import ClaimExtractor, check_worthiness, extract_claims, split_sentences
+
+THRESHOLD = 0.5
+
+@pytest.mark.parametrize("sentence", [
+    "This is a great video.",
+    "It is what it is.",
+    "We are going to talk about that.",
+    "The weather is nice today.",
+    "You will never believe this trick.",
+    "We have more fun than anyone else.",
+    "I think the Moon landing was 1969.",
+    "Did Apollo 11 land in 1969?",
+    "Thanks for watching.",
+    "Yeah.",
+])
+def test_rejects_sentences_without_a_claim(sentence):
+    assert check_worthiness(sentence) < THRESHOLD
+
+@pytest.mark.parametrize("sentence", [
+    "The Eiffel Tower was built in 1889.",
+    "Unemployment rose to 5 percent last year.",
+    "Vaccines cause autism in children.",
+    "Canada has more lakes than the United States.",
+    "The Senate passed the bill with 52 votes.",
+    "Half of all Americans own a dog.",
+])
+def test_accepts_verifiable_claims(sentence):
+    assert check_worthiness(sentence) >= THRESHOLD
+
+def test_split_sentences_keeps_abbreviations_and_decimals():
+    text = "Dr. Smith moved to the U.S. in 2001. Inflation was 3.5 percent! Really?"
+    assert split_sentences(text) == [
+        "Dr. Smith moved to the U.S. in 2001.",
+        "Inflation was 3.5 percent!",
+        "Really?",
+    ]
+
+def test_extract_claims_keeps_only_check_worthy_sentences():
+    text = "Hello everyone, this is a great video. Unemployment rose to 5 percent last year."
+    assert extract_claims(text) == ["Unemployment rose to 5 percent last year."]
+
+def test_extractor_skips_claims_already_seen():
+    extractor = ClaimExtractor()
+    claim = "The Eiffel Tower was built in 1889."
+    assert extractor.extract(claim) == [claim]
+    assert extractor.extract("  the eiffel tower was BUILT in 1889 ") == []
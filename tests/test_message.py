@@ -0,0 +1,98 @@
+import threading
+import pytest
+from models import message as message_module
+from models.message import Message, new_message_id
+
+def make_message(**overrides):
+    fields = dict(
+        sender="for_agent",
+        receiver="judge_agent",
+        message_type="search_results",
+        content={"query": "The Eiffel Tower was built in 1889", "sources": [{"url": "https://example.com", "content": "1889"}]},
+        metadata={"stance": "supporting"},
+        correlation_id="request-1",
+    )
+    fields.update(overrides)
+    return Message(**fields)
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(message_module, "orjson", None)
+    return request.param
+
+@pytest.fixture(params=["msgpack", "json"])
+def bytes_backend(request, monkeypatch):
+    if request.param == "msgpack":
+        pytest.importorskip("msgpack")
+    else:
+        monkeypatch.setattr(message_module, "msgpack", None)
+    return request.param
+
+def test_defaults_are_filled_in():
+    message = make_message()
+    assert isinstance(message.timestamp, float)
+    assert message.message_id
+    assert make_message().message_id != message.message_id
+
+def test_json_round_trip(json_backend):
+    message = make_message()
+    encoded = message.to_json()
+    assert isinstance(encoded, bytes)
+    assert Message.from_json(encoded) == message
+
+def test_json_encodings_are_interchangeable(monkeypatch):
+    pytest.importorskip("orjson")
+    message = make_message()
+    with_orjson = message.to_json()
+    monkeypatch.setattr(message_module, "orjson", None)
+    assert Message.from_json(with_orjson) == message
+    assert Message.from_json(message.to_json()) == message
+
+def test_json_falls_back_to_str_for_unknown_types(json_backend):
+    message = make_message(content={"type": object})
+    assert Message.from_json(message.to_json()).content == {"type": str(object)}
+
+def test_bytes_round_trip(bytes_backend):
+    message = make_message()
+    encoded = message.to_bytes()
+    assert isinstance(encoded, bytes)
+    assert Message.from_bytes(encoded) == message
+
+def test_from_bytes_accepts_json():
+    message = make_message()
+    assert Message.from_bytes(message.to_json()) == message
+
+def test_with_correlation_returns_a_changed_copy():
+    message = make_message()
+    correlated = message.with_correlation("request-2")
+    assert correlated.correlation_id == "request-2"
+    assert message.correlation_id == "request-1"
+    assert correlated.message_id == message.message_id
+    assert correlated.content is message.content
+
+def test_messages_are_immutable():
+    message = make_message()
+    with pytest.raises(AttributeError):
+        message.content = {}
+
+def test_ids_are_unique_across_threads():
+    per_thread = 2000
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append([new_message_id() for _ in range(per_thread)])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [message_id for batch in results for message_id in batch]
+    assert len(ids) == 8 * per_thread
+    assert len(set(ids)) == len(ids)
@@ -0,0 +1,47 @@
+import time
+from processing.ordered_pool import OrderedWorkerPool
+
+def drain(pool, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = pool.stats()
+        if stats["submitted"] == stats["completed"] + stats["dropped"] + stats["errors"] and not stats["awaiting_order"]:
+            return stats
+        time.sleep(0.01)
+    raise AssertionError(f"pool did not drain: {pool.stats()}")
+
+def test_results_arrive_in_submission_order():
+    delivered = []
+    pool = OrderedWorkerPool(lambda n: time.sleep(0.01 * (5 - n)) or n, delivered.append, workers=4)
+    for n in range(5):
+        pool.submit(n)
+    drain(pool)
+    pool.close()
+    assert delivered == [0, 1, 2, 3, 4]
+
+def test_worker_and_delivery_failures_are_counted_separately(caplog):
+    delivered = []
+
+    def worker(n):
+        if n == 1:
+            raise RuntimeError("transcription failed")
+        return n
+
+    def on_result(n):
+        if n == 2:
+            raise ValueError("store refused the segment")
+        delivered.append(n)
+
+    pool = OrderedWorkerPool(worker, on_result, workers=1)
+    for n in range(4):
+        pool.submit(n)
+    drain(pool)
+    deadline = time.monotonic() + 5
+    while delivered != [0, 3] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.close()
+
+    assert delivered == [0, 3]
+    stats = pool.stats()
+    assert (stats["completed"], stats["errors"], stats["delivery_errors"]) == (3, 1, 1)
+    assert "transcription failed" in caplog.text and "store refused the segment" in caplog.text
@@ -0,0 +1,68 @@
+import random
+from services import sources as sources_module
+from services.cache import MemoryCache
+from services.sources import (
+    canonical_url, estimated_similarity, expand_source, minhash, normalize_sources, shingles, source_store
+)
+
+def words(count, seed):
+    rng = random.Random(seed)
+    return [f"word{rng.randrange(1000)}" for _ in range(count)]
+
+def test_canonical_url():
+    assert canonical_url("HTTPS://www.Example.com:443/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert canonical_url("http://example.com:8080/") == "http://example.com:8080"
+    assert canonical_url(" not a url ") == "not a url"
+
+def test_identical_sets_have_similarity_one():
+    sketch = minhash(shingles(" ".join(words(200, 1))))
+    assert estimated_similarity(sketch, sketch) == 1.0
+    assert estimated_similarity(frozenset(), frozenset()) == 0.0
+
+def test_similarity_estimate_tracks_jaccard():
+    text = words(300, 2)
+    edited = list(text)
+    for index in range(0, 300, 10):
+        edited[index] = "changed"
+    a, b = shingles(" ".join(text)), shingles(" ".join(edited))
+    exact = len(a & b) / len(a | b)
+    assert abs(estimated_similarity(minhash(a), minhash(b)) - exact) < 0.2
+    unrelated = shingles(" ".join(words(300, 3)))
+    assert estimated_similarity(minhash(a), minhash(unrelated)) < 0.1
+
+def test_duplicates_collapse_into_the_first_source():
+    text = " ".join(words(60, 4))
+    near = text.replace(text.split()[30], "edited", 1)
+    sources = normalize_sources([
+        {"url": "https://example.com/story?utm_medium=social", "content": text},
+        {"url": "http://www.example.com/story/", "content": text[:100]},
+        {"url": "https://mirror.example.org/story", "content": text.upper()},
+        {"url": "https://syndicated.example.net/story", "content": near},
+        {"url": "https://other.example.com", "content": " ".join(words(60, 5))},
+    ], max_chars=0)
+    assert [source["url"] for source in sources] == ["https://example.com/story", "https://other.example.com"]
+    assert sources[0]["content"] == text
+    assert sources[0]["also_at"] == ["https://mirror.example.org/story", "https://syndicated.example.net/story"]
+
+def test_long_content_is_truncated_and_expandable():
+    text = " ".join(words(200, 6))
+    [source] = normalize_sources([{"url": "https://example.com", "content": text}], max_chars=100)
+    assert source["truncated"] is True
+    assert len(source["content"]) <= 101 and source["content"].endswith("…")
+    assert expand_source(source["id"])["content"] == text
+
+def test_truncated_sources_survive_a_second_pass(monkeypatch):
+    text = " ".join(words(200, 7))
+    first = normalize_sources([{"url": "https://example.com", "content": text}], max_chars=100)
+    # Full text still stored: restored, compared and cut again
+    assert normalize_sources(first, max_chars=100) == first
+    assert normalize_sources(first, max_chars=0)[0] == {"url": "https://example.com", "content": text}
+
+    # Full text expired: kept as cut, still marked truncated under its id
+    monkeypatch.setattr(sources_module, "source_store", MemoryCache())
+    [again] = normalize_sources(first, max_chars=100)
+    assert again == first[0]
+
+def test_store_defaults_follow_the_claim_cache():
+    assert source_store.max_size >= 2 * 5 * 1024
+    assert source_store.ttl >= 3600
@@ -0,0 +1,50 @@
+import pytest
+from services.transcript_store import TranscriptStore
+
+@pytest.mark.parametrize("start, end", [
+    ("soon", 10),
+    ([1], 10),
+    (True, 10),
+    (1, float("inf")),
+    (1, "nan"),
+    (5, 4),
+])
+def test_publish_rejects_invalid_times(start, end):
+    store = TranscriptStore()
+    with pytest.raises(ValueError):
+        store.publish("session", "text", start, end)
+    assert store.last_seq == 0
+    assert store.stats()["rejected_segments"] == 1
+
+def test_publish_accepts_numeric_strings():
+    segment = TranscriptStore().publish("session", "text", "1.5", "2")
+    assert (segment["start"], segment["end"]) == (1.5, 2.0)
+
+def test_publish_rejects_out_of_order_starts():
+    store = TranscriptStore()
+    store.publish("session", "first", 10, 12)
+    with pytest.raises(ValueError):
+        store.publish("session", "earlier", 9, 13)
+    # Overlapping but later segments and other sessions are fine
+    store.publish("session", "overlap", 11, 14)
+    store.publish("other", "earlier elsewhere", 1, 2)
+    assert [segment["text"] for segment in store.window("session", start=0)] == ["first", "overlap"]
+    assert [segment["text"] for segment in store.window("session", start=12.5, end=20)] == ["overlap"]
+
+def test_wait_all_since_returns_every_session_in_order():
+    store = TranscriptStore()
+    first = store.publish("a", "one", 1, 2)
+    store.publish("b", "two", 1, 2)
+    store.publish("a", "three", 2, 3)
+    last_seq, segments = store.wait_all_since(first["seq"] - 1, timeout=0)
+    assert last_seq == store.last_seq
+    assert [segment["text"] for segment in segments] == ["one", "two", "three"]
+    assert store.wait_all_since(last_seq, timeout=0) == (last_seq, [])
+
+def test_wait_all_since_skips_evicted_sessions():
+    store = TranscriptStore(max_sessions=1)
+    store.publish("a", "one", 1, 2)
+    store.publish("b", "two", 1, 2)
+    last_seq, segments = store.wait_all_since(0, timeout=0)
+    assert last_seq == 2
+    assert [segment["session"] for segment in segments] == ["b"]
@@ -8,6 +8,8 @@ def combine_transcript(transcript):
     )
     return combined_text
 
-transcript = YouTubeTranscriptApi.get_transcript('W7RUWlwgjQI')
-combined = combine_transcript(transcript)
-print(combined)
\ No newline at end of file
+if __name__ == "__main__":
+    # Fetch only when run as a script, never on import
+    transcript = YouTubeTranscriptApi.get_transcript('W7RUWlwgjQI')
+    combined = combine_transcript(transcript)
+    print(combined)